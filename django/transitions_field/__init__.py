@@ -4,6 +4,7 @@ from .transitions import (
     StateTransitionsChecker,
     TransitionRule,
     TransitionsFieldError,
+    TransitionsGraph,
 )
 
 
@@ -13,4 +14,5 @@ __all__ = [
     'TransitionRule',
     'StateTransitionsChecker',
     'TransitionsFieldError',
+    'TransitionsGraph',
 ]
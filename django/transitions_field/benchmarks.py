@@ -0,0 +1,185 @@
+"""
+Micro-benchmarks for StateField.
+
+Run from the `django` directory of the repository:
+
+    python -m transitions_field.benchmarks
+"""
+
+from collections.abc import Callable
+from functools import partial
+from itertools import cycle
+from timeit import repeat
+from typing import Any
+
+import django
+from django.conf import settings
+
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=['django.contrib.contenttypes'],
+        DATABASES={
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        },
+    )
+    django.setup()
+
+from django.db import connection, models  # noqa: E402
+
+from .metrics import TransitionMetrics  # noqa: E402
+from .transitions import StateField, StateTransitionsChecker  # noqa: E402
+
+
+class LegacyChecker(StateTransitionsChecker):
+    """Same checks, but a subclass: StateField falls back to per-call checks."""
+
+
+class LegacyStateField(StateField):
+    transitions_checker = LegacyChecker
+
+
+class PropertyStateField(StateField):
+    """Pre-descriptor setter: every assignment, hydration included, is checked."""
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        setattr(cls, name, property(
+            lambda obj: obj.__dict__.get(name),
+            lambda obj, value: self._set_value(obj, name, value),
+        ))
+
+    def _set_value(self, obj, name, value):
+        old_value = obj.__dict__.get(name)
+        new_value = self.to_python(value)
+        if not self._validate_on_change(old_value, new_value):
+            raise ValueError(new_value)
+        obj.__dict__[name] = new_value
+
+
+def make_states(size: int) -> type[models.TextChoices]:
+    return models.TextChoices(  # type: ignore
+        f'States{size}', [(f'S{i}', f's{i}') for i in range(size)]
+    )
+
+
+def make_rules(states: type[models.TextChoices]) -> list:
+    """Each state goes to the next two and to the last one, the last is final."""
+    members = list(states)
+    last = members[-1]
+    rules = [
+        (state, [*members[i + 1 : i + 3], last])
+        for i, state in enumerate(members[:-1])
+    ]
+    return [*rules, (last, None)]
+
+
+def make_model(
+    field_class: type[StateField],
+    states: type[models.TextChoices],
+    rules,
+    name: str | None = None,
+) -> type[models.Model]:
+    name = name or f'{field_class.__name__}{len(states)}{"Rules" if rules else ""}'
+    return type(
+        name,
+        (models.Model,),
+        {
+            '__module__': __name__,
+            'state': field_class(default=states.S0, rules=rules),
+            'Meta': type('Meta', (), {'app_label': 'benchmarks'}),
+        },
+    )
+
+
+def assignments_per_sec(model: type[models.Model], number: int = 20_000) -> float:
+    """Walks the chain of states forth, creating a new object at the end."""
+    sequence = list(model._meta.get_field('state').choices_class)[1:]
+
+    def run() -> None:
+        obj = model()
+        states = cycle(sequence)
+        for _ in range(number):
+            state = next(states)
+            if state is sequence[0]:
+                obj = model()
+            obj.state = state
+
+    return number / min(repeat(run, number=1, repeat=5))
+
+
+def report(title: str, cases: dict[str, Callable[[], Any]]) -> None:
+    print(title)
+    results = {name: stmt() for name, stmt in cases.items()}
+    baseline = next(iter(results.values()))
+    for name, rate in results.items():
+        print(f'  {name:<32}{rate:>12,.0f} assignments/s{rate / baseline:>8.2f}x')
+
+
+def bench_assignments(sizes: tuple[int, ...] = (4, 32, 128)) -> None:
+    for size in sizes:
+        states = make_states(size)
+        for rules in (None, make_rules(states)):
+            legacy = make_model(LegacyStateField, states, rules)
+            compiled = make_model(StateField, states, rules)
+            report(
+                f'{size} states, {"rules" if rules else "default scenario"}',
+                {
+                    'checker per assignment': lambda: assignments_per_sec(legacy),
+                    'compiled graph': lambda: assignments_per_sec(compiled),
+                },
+            )
+
+
+def bench_metrics(size: int = 32) -> None:
+    states = make_states(size)
+    rules = make_rules(states)
+    cases = {}
+    for title, metrics in (
+        ('no metrics', None),
+        ('counters', TransitionMetrics()),
+        ('counters and timing', TransitionMetrics(timing=True)),
+    ):
+        model = make_model(StateField, states, rules, f'Measured{len(cases)}')
+        model._meta.get_field('state').metrics = metrics
+        cases[title] = partial(assignments_per_sec, model)
+    report(f'{size} states, rules, metrics', cases)
+
+
+def bench_hydration(size: int = 200_000) -> None:
+    states = make_states(4)
+    model_classes = {
+        'CharField': type(
+            'PlainRow',
+            (models.Model,),
+            {
+                '__module__': __name__,
+                'state': models.CharField(max_length=8, default=states.S0),
+                'Meta': type('Meta', (), {'app_label': 'benchmarks'}),
+            },
+        ),
+        'StateField, property setter': make_model(
+            PropertyStateField, states, None, 'PropertyStateRow'
+        ),
+        'StateField': make_model(StateField, states, None, 'StateRow'),
+    }
+    with connection.schema_editor() as editor:
+        for model in model_classes.values():
+            editor.create_model(model)
+    for model in model_classes.values():
+        model.objects.bulk_create((model() for _ in range(size)), batch_size=10_000)
+
+    print(f'Iterate over {size:,} rows of SQLite queryset')
+    results = {
+        name: min(repeat(lambda: list(model.objects.all()), number=1, repeat=5))
+        for name, model in model_classes.items()
+    }
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        print(f'  {name:<32}{size / seconds:>12,.0f} rows/s{baseline / seconds:>8.2f}x')
+
+
+if __name__ == '__main__':
+    bench_assignments()
+    bench_metrics()
+    bench_hydration()
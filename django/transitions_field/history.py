@@ -0,0 +1,172 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from threading import Lock, local
+from time import monotonic
+from typing import Self
+from weakref import WeakValueDictionary
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+__all__ = [
+    'AbstractTransitionRecord',
+    'TransitionEvent',
+    'TransitionHistory',
+]
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class TransitionEvent:
+    """State change made through `StateField`."""
+
+    instance: models.Model
+    field: str
+    old: str | None
+    new: str
+    timestamp: datetime
+
+    @property
+    def model(self) -> str:
+        return self.instance._meta.label
+
+    @property
+    def pk(self):
+        # Читаем при записи, а не при изменении: объект мог быть сохранён позже
+        return self.instance.pk
+
+
+class AbstractTransitionRecord(models.Model):
+    """
+    Base model for the audit table. Subclass it in one of your apps:
+
+    >>> class TransitionRecord(AbstractTransitionRecord):
+    >>>     class Meta:
+    >>>         app_label = 'billing'
+    """
+
+    model = models.CharField(max_length=255)
+    object_pk = models.CharField(max_length=255, null=True)
+    field = models.CharField(max_length=255)
+    old_state = models.CharField(max_length=255, null=True)
+    new_state = models.CharField(max_length=255)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_event(cls, event: TransitionEvent) -> Self:
+        return cls(
+            model=event.model,
+            object_pk=None if event.pk is None else str(event.pk),
+            field=event.field,
+            old_state=event.old,
+            new_state=event.new,
+            timestamp=event.timestamp,
+        )
+
+
+class TransitionHistory:
+    """
+    Buffers transition events and writes them with `bulk_create`.
+
+    Events recorded inside a transaction are buffered only when it commits
+    (events of a rolled back transaction or savepoint are dropped), and the
+    buffer is flushed after the last committed event. Outside
+    transactions the buffer is flushed when it holds `max_size` events or
+    its oldest event is `max_delay` seconds old. The delay is checked when
+    events are recorded, so call `flush()` on shutdown.
+
+    `buffered` and `flushed` count events accepted into the buffer and
+    written to the database, `flushes` counts `bulk_create` calls.
+    """
+
+    def __init__(
+        self,
+        record_model: type[AbstractTransitionRecord],
+        max_size: int = 500,
+        max_delay: float = 5.0,
+        using: str | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.record_model = record_model
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.using = using
+        self.clock = clock
+        self.buffered = 0
+        self.flushed = 0
+        self.flushes = 0
+        self._events: list[TransitionEvent] = []
+        self._started: float | None = None
+        self._lock = Lock()
+        self._local = local()
+
+    @property
+    def pending(self) -> int:
+        return len(self._events)
+
+    def record(
+        self, instance: models.Model, field: str, old: str | None, new: str
+    ) -> None:
+        event = TransitionEvent(instance, field, old, new, timezone.now())
+        if not transaction.get_connection(self.using).in_atomic_block:
+            self._add(event)
+            return
+        # Ожидающие коммита события потока (по id: события сравниваются по
+        # значению). Ссылки слабые: при откате, в том числе точки сохранения,
+        # Django отбрасывает колбэки вместе с событиями, и остаются только
+        # те, что ещё будут вызваны
+        self._pending()[id(event)] = event
+        transaction.on_commit(partial(self._commit, event), using=self.using)
+
+    def _pending(self) -> WeakValueDictionary[int, TransitionEvent]:
+        try:
+            return self._local.pending
+        except AttributeError:
+            self._local.pending = WeakValueDictionary()
+            return self._local.pending
+
+    def _commit(self, event: TransitionEvent) -> None:
+        pending = self._pending()
+        pending.pop(id(event), None)
+        # Буфер сбрасывает последний из выживших колбэков транзакции
+        self._add(event, flush=not pending)
+
+    def _add(self, event: TransitionEvent, flush: bool = False) -> None:
+        with self._lock:
+            self._events.append(event)
+            self.buffered += 1
+            if self._started is None:
+                self._started = self.clock()
+            flush = (
+                flush
+                or len(self._events) >= self.max_size
+                or self.clock() - self._started >= self.max_delay
+            )
+        if flush:
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes buffered events, returns their number."""
+        with self._lock:
+            events, self._events = self._events, []
+            self._started = None
+        if not events:
+            return 0
+        try:
+            self.record_model._default_manager.db_manager(self.using).bulk_create(
+                [self.record_model.from_event(event) for event in events]
+            )
+        except Exception:
+            with self._lock:
+                self._events[:0] = events
+                self._started = self.clock()
+            raise
+        with self._lock:
+            self.flushed += len(events)
+            self.flushes += 1
+        return len(events)
@@ -0,0 +1,103 @@
+from collections import Counter
+from collections.abc import Callable
+from threading import Lock
+from time import perf_counter
+
+
+__all__ = ['TransitionMetrics']
+
+type TransitionKey = tuple[str, str, str]
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+class TransitionMetrics:
+    """
+    Counts transition attempts and denials per (field, from, to) and,
+    with `timing=True`, the time spent in validation.
+
+    Pass it to `StateField(metrics=...)`; fields without metrics only pay
+    for an `is None` check. One instance can be shared by several fields.
+    Exceptions raised by the validator (e.g. for unknown states) are
+    counted as denials.
+    """
+
+    def __init__(self, timing: bool = False) -> None:
+        self.timing = timing
+        self.attempts: Counter[TransitionKey] = Counter()
+        self.denials: Counter[TransitionKey] = Counter()
+        self.seconds: Counter[TransitionKey] = Counter()
+        self._lock = Lock()
+
+    def measure(
+        self,
+        field: str,
+        validator: Callable[[str, str], bool],
+        old_value: str,
+        new_value: str,
+    ) -> bool:
+        """
+        Calls `validator(old_value, new_value)` and records the outcome.
+        States are converted to labels with `str()` only on export.
+        """
+        key = (field, old_value, new_value)
+        allowed = False
+        start = perf_counter() if self.timing else 0.0
+        try:
+            allowed = validator(old_value, new_value)
+        finally:
+            elapsed = perf_counter() - start if self.timing else 0.0
+            with self._lock:
+                self.attempts[key] += 1
+                if not allowed:
+                    self.denials[key] += 1
+                if self.timing:
+                    self.seconds[key] += elapsed
+        return allowed
+
+    def reset(self) -> None:
+        with self._lock:
+            self.attempts.clear()
+            self.denials.clear()
+            self.seconds.clear()
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, float]]]:
+        """`{field: {'from->to': {'attempts': ..., 'denials': ..., 'seconds': ...}}}`"""
+        result: dict[str, dict[str, dict[str, float]]] = {}
+        with self._lock:
+            for key, attempts in self.attempts.items():
+                field, old_value, new_value = map(str, key)
+                stats: dict[str, float] = {
+                    'attempts': attempts,
+                    'denials': self.denials[key],
+                }
+                if self.timing:
+                    stats['seconds'] = self.seconds[key]
+                result.setdefault(field, {})[f'{old_value}->{new_value}'] = stats
+        return result
+
+    def to_prometheus(self, prefix: str = 'statefield_transition') -> str:
+        """Counters in the Prometheus text exposition format."""
+        series = [
+            ('attempts_total', 'State transition attempts.', self.attempts),
+            ('denials_total', 'Denied state transitions.', self.denials),
+        ]
+        if self.timing:
+            series.append(
+                ('seconds_total', 'Time spent validating transitions.', self.seconds)
+            )
+        lines = []
+        with self._lock:
+            for suffix, help_text, counter in series:
+                name = f'{prefix}_{suffix}'
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for key, value in counter.items():
+                    field, old_value, new_value = map(str, key)
+                    lines.append(
+                        f'{name}{{field="{_label(field)}",from="{_label(old_value)}",'
+                        f'to="{_label(new_value)}"}} {value}'
+                    )
+        return '\n'.join(lines) + '\n'
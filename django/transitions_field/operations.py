@@ -0,0 +1,141 @@
+from collections.abc import Mapping, Sequence
+
+from django.db import NotSupportedError
+from django.db.migrations.operations.base import Operation
+
+
+__all__ = ['InstallTransitionsTrigger']
+
+
+def quote_value(value: str) -> str:
+    """
+    Standard SQL string literal. `schema_editor.quote_value` is not used:
+    on PostgreSQL it doubles `%`, expecting params interpolation.
+    """
+    return "'{}'".format(value.replace("'", "''"))
+
+
+class InstallTransitionsTrigger(Operation):
+    """
+    Migration operation installing a database trigger that rejects
+    disallowed state changes (PostgreSQL and SQLite).
+
+    Rules are not part of the migration state, so the adjacency is passed
+    explicitly in the form returned by `TransitionsGraph.as_dict()`:
+    `{state: [allowed states] | None}`, where `None` means any state. Copy
+    it from `Model._meta.get_field('state').graph.as_dict()`:
+
+    >>> operations = [
+    >>>     InstallTransitionsTrigger(
+    >>>         model_name='payment',
+    >>>         field_name='state',
+    >>>         transitions={'start': ['init'], 'init': None, 'done': []},
+    >>>     ),
+    >>> ]
+
+    The trigger fires `BEFORE UPDATE` of the column when the value changes,
+    so the check runs in the same statement as the update. A rejected
+    change raises `IntegrityError`.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        field_name: str,
+        transitions: Mapping[str, Sequence[str] | None],
+        name: str | None = None,
+    ) -> None:
+        if not transitions:
+            raise ValueError('Transitions table must not be empty')
+        self.model_name = model_name
+        self.field_name = field_name
+        self.transitions = transitions
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        # Триггер не меняет состояние моделей
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in self.create_sql(model, schema_editor):
+                schema_editor.execute(sql, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            for sql in self.drop_sql(model, schema_editor):
+                schema_editor.execute(sql, params=None)
+
+    def describe(self):
+        return f'Install transitions trigger on {self.model_name}.{self.field_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_{self.field_name}_transitions'
+
+    def trigger_name(self, model) -> str:
+        return self.name or f'{model._meta.db_table}_{self.field_name}_transitions'
+
+    def condition(self, old: str, new: str) -> str:
+        """SQL condition which is true for allowed transitions."""
+
+        def values(states) -> str:
+            return ', '.join(quote_value(state) for state in states)
+
+        clauses = []
+        if any_target := [
+            state for state, targets in self.transitions.items() if targets is None
+        ]:
+            clauses.append(f'{old} IN ({values(any_target)})')
+        for state, targets in self.transitions.items():
+            if targets:
+                clauses.append(
+                    f'({old} = {quote_value(state)} AND {new} IN ({values(targets)}))'
+                )
+        allowed = ' OR '.join(clauses) or '1 = 0'
+        return f'{new} IN ({values(self.transitions)}) AND ({allowed})'
+
+    def create_sql(self, model, schema_editor) -> list[str]:
+        vendor = schema_editor.connection.vendor
+        quote_name = schema_editor.quote_name
+        name = quote_name(self.trigger_name(model))
+        table = quote_name(model._meta.db_table)
+        column = quote_name(model._meta.get_field(self.field_name).column)
+        condition = self.condition(f'OLD.{column}', f'NEW.{column}')
+        message = (
+            f'State transition is not allowed for {self.model_name}.{self.field_name}'
+        )
+        if vendor == 'sqlite':
+            return [
+                f'CREATE TRIGGER {name} BEFORE UPDATE OF {column} ON {table} '
+                f'FOR EACH ROW WHEN OLD.{column} IS NOT NEW.{column} '
+                f'AND NOT ({condition}) '
+                f'BEGIN SELECT RAISE(ABORT, {quote_value(message)}); END'
+            ]
+        if vendor == 'postgresql':
+            return [
+                f'CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$ '
+                f'BEGIN IF NOT ({condition}) THEN '
+                f'RAISE EXCEPTION {quote_value(message + ": % -> %")}, '
+                f"OLD.{column}, NEW.{column} USING ERRCODE = 'check_violation'; "
+                f'END IF; RETURN NEW; END; $$ LANGUAGE plpgsql',
+                f'CREATE TRIGGER {name} BEFORE UPDATE OF {column} ON {table} '
+                f'FOR EACH ROW WHEN (OLD.{column} IS DISTINCT FROM NEW.{column}) '
+                f'EXECUTE FUNCTION {name}()',
+            ]
+        raise NotSupportedError(f'Transitions triggers are not supported on {vendor}')
+
+    def drop_sql(self, model, schema_editor) -> list[str]:
+        vendor = schema_editor.connection.vendor
+        name = schema_editor.quote_name(self.trigger_name(model))
+        table = schema_editor.quote_name(model._meta.db_table)
+        if vendor == 'sqlite':
+            return [f'DROP TRIGGER IF EXISTS {name}']
+        if vendor == 'postgresql':
+            return [
+                f'DROP TRIGGER IF EXISTS {name} ON {table}',
+                f'DROP FUNCTION IF EXISTS {name}()',
+            ]
+        raise NotSupportedError(f'Transitions triggers are not supported on {vendor}')
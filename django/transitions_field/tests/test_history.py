@@ -0,0 +1,123 @@
+from django.db import connection, models, transaction
+from django.test import TestCase
+
+from ..history import AbstractTransitionRecord, TransitionHistory
+from ..transitions import StateField
+
+
+class TestStates(models.TextChoices):
+    START = 'start', 'Начало'
+    MIDDLE = 'middle', 'Середина'
+    END = 'end', 'Конец'
+
+
+class TestTransitionHistory(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        class TransitionRecord(AbstractTransitionRecord):
+            class Meta:
+                app_label = 'cycle'
+
+        cls.record_model = TransitionRecord
+        cls.history = TransitionHistory(TransitionRecord)
+
+        class TrackedModel(models.Model):
+            state = StateField(  # type: ignore
+                default=TestStates.START, history=cls.history
+            )
+
+            class Meta:
+                app_label = 'cycle'
+
+        cls.model = TrackedModel
+        with connection.schema_editor() as editor:
+            editor.create_model(TransitionRecord)
+            editor.create_model(TrackedModel)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.model)
+            editor.delete_model(cls.record_model)
+
+    def setUp(self):
+        self.history.flush()
+        self.history.max_size = 500
+        self.history.max_delay = 5.0
+        self.history.buffered = self.history.flushed = self.history.flushes = 0
+
+    def test_flushed_once_on_commit(self):
+        obj = self.model()
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save()
+            obj.state = TestStates.MIDDLE
+            obj.state = TestStates.END
+            self.assertEqual(self.history.buffered, 0)
+        self.assertEqual(self.history.flushed, 2)
+        self.assertEqual(self.history.flushes, 1)
+        self.assertEqual(
+            list(
+                self.record_model.objects.order_by('pk').values_list(
+                    'model', 'object_pk', 'field', 'old_state', 'new_state'
+                )
+            ),
+            [
+                ('cycle.TrackedModel', str(obj.pk), 'state', 'start', 'middle'),
+                ('cycle.TrackedModel', str(obj.pk), 'state', 'middle', 'end'),
+            ],
+        )
+
+    def test_rolled_back_events_dropped(self):
+        obj = self.model()
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.state = TestStates.MIDDLE
+            try:
+                with transaction.atomic():
+                    obj.state = TestStates.END
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.history.flushed, 1)
+        self.assertEqual(self.record_model.objects.get().new_state, 'middle')
+
+    def test_batched_when_last_event_rolled_back(self):
+        obj = self.model()
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.state = TestStates.MIDDLE
+            other = self.model()
+            other.state = TestStates.MIDDLE
+            try:
+                with transaction.atomic():
+                    obj.state = TestStates.END
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.history.flushed, 2)
+        self.assertEqual(self.history.flushes, 1)
+
+    def test_size_threshold(self):
+        self.history.max_size = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                obj = self.model()
+                obj.state = TestStates.MIDDLE
+        self.assertEqual(self.history.flushed, 3)
+        self.assertEqual(self.history.flushes, 2)
+
+    def test_time_threshold(self):
+        now = [0.0]
+        history = TransitionHistory(
+            self.record_model, max_delay=1.0, clock=lambda: now[0]
+        )
+        obj = self.model()
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(3):
+                history.record(obj, 'state', 'start', 'middle')
+        callbacks[0]()
+        self.assertEqual((history.buffered, history.flushed), (1, 0))
+        now[0] = 2.0
+        callbacks[1]()
+        self.assertEqual((history.buffered, history.flushed), (2, 2))
+        self.assertEqual(history.pending, 0)
@@ -0,0 +1,74 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.test import SimpleTestCase
+
+from ..metrics import TransitionMetrics
+from ..transitions import StateField, TransitionsFieldError
+
+
+class TestStates(models.TextChoices):
+    START = 'start', 'Начало'
+    MIDDLE = 'middle', 'Середина'
+    END = 'end', 'Конец'
+
+
+class TestTransitionMetrics(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.metrics = TransitionMetrics(timing=True)
+
+        class MeasuredModel(models.Model):
+            state = StateField(  # type: ignore
+                default=TestStates.START, metrics=cls.metrics
+            )
+
+            class Meta:
+                app_label = 'cycle'
+
+        cls.model = MeasuredModel
+
+    def setUp(self):
+        self.metrics.reset()
+
+    def test_counts(self):
+        obj = self.model()
+        obj.state = TestStates.MIDDLE
+        obj.state = TestStates.MIDDLE
+        with self.assertRaises(ValidationError):
+            obj.state = TestStates.START
+        obj.state = TestStates.END
+        stats = self.metrics.as_dict()['cycle.MeasuredModel.state']
+        self.assertEqual(set(stats), {'start->middle', 'middle->start', 'middle->end'})
+        self.assertEqual(stats['start->middle']['attempts'], 1)
+        self.assertEqual(stats['start->middle']['denials'], 0)
+        self.assertEqual(stats['middle->start']['denials'], 1)
+        self.assertGreaterEqual(stats['middle->end']['seconds'], 0)
+
+    def test_validator_errors_counted_as_denials(self):
+        obj = self.model()
+        with self.assertRaises(TransitionsFieldError):
+            obj.state = 'invalid_state'
+        stats = self.metrics.as_dict()['cycle.MeasuredModel.state']
+        self.assertEqual(stats['start->invalid_state']['denials'], 1)
+
+    def test_prometheus(self):
+        obj = self.model()
+        obj.state = TestStates.MIDDLE
+        text = self.metrics.to_prometheus()
+        self.assertIn('# TYPE statefield_transition_attempts_total counter\n', text)
+        self.assertIn(
+            'statefield_transition_attempts_total{field="cycle.MeasuredModel.state",'
+            'from="start",to="middle"} 1\n',
+            text,
+        )
+        self.assertIn('statefield_transition_seconds_total{', text)
+
+    def test_reset(self):
+        obj = self.model()
+        obj.state = TestStates.MIDDLE
+        self.metrics.reset()
+        self.assertEqual(self.metrics.as_dict(), {})
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(StateField(default=TestStates.START).metrics)
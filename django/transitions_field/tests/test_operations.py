@@ -0,0 +1,107 @@
+from django.db import IntegrityError, connection, migrations, models
+from django.db.migrations.state import ProjectState
+from django.test import TransactionTestCase
+
+from ..operations import InstallTransitionsTrigger
+from ..transitions import StateField
+
+
+class TestStates(models.TextChoices):
+    START = 'start', 'Начало'
+    MIDDLE = 'middle', 'Середина'
+    END = 'end', 'Конец'
+    ANY = 'any', 'Любое'
+
+
+class TestInstallTransitionsTrigger(TransactionTestCase):
+    app_label = 'cycle'
+
+    def setUp(self):
+        field = StateField(
+            default=TestStates.START,
+            rules=[
+                (TestStates.START, [TestStates.MIDDLE, TestStates.ANY]),
+                (TestStates.MIDDLE, [TestStates.END, TestStates.START]),
+                (TestStates.END, None),
+            ],
+        )
+        self.operation = InstallTransitionsTrigger(
+            model_name='Order', field_name='state', transitions=field.graph.as_dict()
+        )
+        create_model = migrations.CreateModel(
+            'Order',
+            fields=[
+                ('id', models.AutoField(primary_key=True)),
+                ('state', models.CharField(max_length=10, default='start')),
+            ],
+        )
+        self.initial_state = ProjectState()
+        self.model_state = self.initial_state.clone()
+        create_model.state_forwards(self.app_label, self.model_state)
+        self.trigger_state = self.model_state.clone()
+        self.operation.state_forwards(self.app_label, self.trigger_state)
+        with connection.schema_editor() as editor:
+            create_model.database_forwards(
+                self.app_label, editor, self.initial_state, self.model_state
+            )
+            self.operation.database_forwards(
+                self.app_label, editor, self.model_state, self.trigger_state
+            )
+        self.addCleanup(self.drop_table, create_model)
+        self.model = self.trigger_state.apps.get_model(self.app_label, 'Order')
+        self.pk = self.model.objects.create().pk
+
+    def drop_table(self, create_model):
+        with connection.schema_editor() as editor:
+            create_model.database_backwards(
+                self.app_label, editor, self.model_state, self.initial_state
+            )
+
+    def move(self, state):
+        self.model.objects.filter(pk=self.pk).update(state=state)
+        return self.model.objects.get(pk=self.pk).state
+
+    def test_as_dict(self):
+        self.assertEqual(
+            self.operation.transitions,
+            {
+                'start': ['middle', 'any'],
+                'middle': ['start', 'end'],
+                'end': [],
+                'any': None,
+            },
+        )
+
+    def test_allowed_transitions(self):
+        self.assertEqual(self.move('middle'), 'middle')
+        self.assertEqual(self.move('start'), 'start')
+        self.assertEqual(self.move('start'), 'start')
+
+    def test_disallowed_transitions(self):
+        with self.assertRaises(IntegrityError):
+            self.move('end')
+        self.move('middle')
+        self.move('end')
+        for state in ('start', 'invalid'):
+            with self.subTest(state=state), self.assertRaises(IntegrityError):
+                self.move(state)
+
+    def test_any_state_rule(self):
+        self.assertEqual(self.move('any'), 'any')
+        self.assertEqual(self.move('end'), 'end')
+
+    def test_database_backwards(self):
+        with connection.schema_editor() as editor:
+            self.operation.database_backwards(
+                self.app_label, editor, self.trigger_state, self.model_state
+            )
+        self.assertEqual(self.move('end'), 'end')
+
+    def test_deconstruct(self):
+        name, args, kwargs = self.operation.deconstruct()
+        self.assertEqual(name, 'InstallTransitionsTrigger')
+        self.assertEqual(kwargs['field_name'], 'state')
+
+    def test_empty_transitions(self):
+        with self.assertRaises(ValueError):
+            InstallTransitionsTrigger('model', 'state', transitions={})
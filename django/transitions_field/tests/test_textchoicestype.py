@@ -0,0 +1,20 @@
+from django.db import models
+from django.test import SimpleTestCase
+
+from ..textchoicestype import TextChoiceType
+
+
+class Colors(models.TextChoices):
+    RED = 'red', 'Красный'
+    GREEN = 'green', 'Зелёный'
+
+
+class TestTextChoiceType(SimpleTestCase):
+    def test_members(self):
+        self.assertIsInstance(Colors.RED, TextChoiceType)
+        self.assertIsInstance(Colors.GREEN, TextChoiceType)
+
+    def test_not_members(self):
+        for value in ('red', None, 1, Colors):
+            with self.subTest(value=value):
+                self.assertNotIsInstance(value, TextChoiceType)
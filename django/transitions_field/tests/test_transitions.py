@@ -1,12 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.test import TestCase
+from django.db import connection, connections, models
+from django.test import TestCase, TransactionTestCase
 
 from ..transitions import (
+    CheckerAdapter,
     StateField,
     StateTransitionsChecker,
     TransitionRule,
     TransitionsFieldError,
+    TransitionsGraph,
+    get_choices_table,
     get_transition_rules,
 )
 
@@ -18,6 +24,25 @@ class TestStates(models.TextChoices):
     ANY = 'any', 'Любое'
 
 
+class TestChoicesTable(TestCase):
+    def test_ordinals(self):
+        table = get_choices_table(TestStates)
+        self.assertEqual(list(table.values), ['start', 'middle', 'end', 'any'])
+        self.assertEqual(table.ordinals['end'], 2)
+        self.assertEqual(table.ordinals[TestStates.END], 2)
+
+    def test_member_interned(self):
+        table = get_choices_table(TestStates)
+        self.assertIs(table.member('middle'), TestStates.MIDDLE)
+        self.assertIs(table.member(TestStates.MIDDLE), TestStates.MIDDLE)
+        for value in ('invalid_state', None, ['start']):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                table.member(value)
+
+    def test_cached_per_class(self):
+        self.assertIs(get_choices_table(TestStates), get_choices_table(TestStates))
+
+
 class TestTransitionRule(TestCase):
     def setUp(self) -> None:
         self.rule = TransitionRule(
@@ -103,6 +128,15 @@ class TestStateTransitionsChecker(TestCase):
         )
         self.assertTrue(checker())
 
+    def test_default_scenario_with_values(self):
+        checker = StateTransitionsChecker(
+            choices_class=TestStates,
+            current_state='middle',  # type: ignore
+            new_state='start',  # type: ignore
+            rules=None,
+        )
+        self.assertFalse(checker())
+
 
 class TestStateField(TestCase):
     def setUp(self):
@@ -142,6 +176,365 @@ class TestStateField(TestCase):
             self.model.state = TestStates.ANY
 
 
+class TestTransitionsGraph(TestCase):
+    def setUp(self):
+        self.rules = get_transition_rules(
+            [
+                (TestStates.START, [TestStates.MIDDLE, TestStates.END]),
+                (TestStates.START, [TestStates.MIDDLE, TestStates.ANY]),
+                (TestStates.MIDDLE, [...]),
+                (TestStates.END, None),
+            ],
+            TestStates,
+        )
+        self.graph = TransitionsGraph.compile(TestStates, self.rules)
+
+    def test_matches_checker(self):
+        for current in TestStates:
+            for new in TestStates:
+                checker = StateTransitionsChecker(
+                    choices_class=TestStates,
+                    current_state=current,
+                    new_state=new,
+                    rules=self.rules,
+                )
+                with self.subTest(current=current, new=new):
+                    self.assertEqual(self.graph.allowed(current, new), checker())
+
+    def test_default_scenario(self):
+        graph = TransitionsGraph.compile(TestStates)
+        self.assertTrue(graph.allowed('start', 'middle'))
+        self.assertTrue(graph.allowed(TestStates.END, TestStates.ANY))
+        self.assertFalse(graph.allowed(TestStates.START, TestStates.END))
+        self.assertFalse(graph.allowed(TestStates.ANY, TestStates.START))
+
+    def test_state_without_rules_allows_any(self):
+        self.assertTrue(self.graph.allowed(TestStates.ANY, TestStates.START))
+
+    def test_invalid_state_raises_error(self):
+        with self.assertRaises(TransitionsFieldError):
+            self.graph.allowed(TestStates.START, 'invalid_state')
+        with self.assertRaises(TransitionsFieldError):
+            self.graph.allowed(None, TestStates.START)
+
+    def test_invalid_rule_raises_error(self):
+        rule = TransitionRule(start_state='invalid_state', target_states=None)  # type: ignore
+        with self.assertRaises(ValueError):
+            TransitionsGraph.compile(TestStates, [rule])
+
+
+class TestReachability(TestCase):
+    def setUp(self):
+        rules = get_transition_rules(
+            [
+                (TestStates.START, [TestStates.MIDDLE]),
+                (TestStates.MIDDLE, [TestStates.ANY, TestStates.START]),
+                (TestStates.ANY, [...]),
+                (TestStates.END, None),
+            ],
+            TestStates,
+        )
+        self.graph = TransitionsGraph.compile(TestStates, rules)
+
+    def test_reachable(self):
+        self.assertEqual(
+            self.graph.reachable(TestStates.START), {'start', 'middle', 'any', 'end'}
+        )
+        self.assertEqual(self.graph.reachable(TestStates.END), {'end'})
+
+    def test_shortest_path(self):
+        self.assertEqual(
+            self.graph.shortest_path('start', 'end'), ('start', 'middle', 'any', 'end')
+        )
+        self.assertEqual(self.graph.shortest_path('any', 'start'), ('any', 'start'))
+        self.assertEqual(self.graph.shortest_path('end', 'end'), ('end',))
+        self.assertIsNone(self.graph.shortest_path('end', 'start'))
+        self.assertFalse(self.graph.can_reach('end', 'start'))
+        with self.assertRaises(TransitionsFieldError):
+            self.graph.shortest_path('invalid_state', 'start')
+
+    def test_default_scenario(self):
+        graph = TransitionsGraph.compile(TestStates)
+        self.assertEqual(graph.shortest_path('start', 'any'), tuple(TestStates.values))
+        self.assertIsNone(graph.shortest_path('middle', 'start'))
+
+    def test_paths_cached(self):
+        self.graph.reachable('start')
+        self.assertIs(self.graph._paths_from('start'), self.graph._paths['start'])
+
+    def test_allows_path(self):
+        self.assertTrue(self.graph.allows_path(['start', 'middle', 'middle', 'any']))
+        self.assertFalse(self.graph.allows_path(['start', 'any']))
+
+    def test_field_queries(self):
+        field = StateField(default=TestStates.START, rules=[(TestStates.END, None)])
+        self.assertEqual(field.shortest_path(TestStates.END, 'start'), None)
+        self.assertEqual(field.reachable('end'), {'end'})
+
+
+class TestTransitionsValidator(TestCase):
+    def make_model(self, field_class):
+        class TestModel(models.Model):
+            state = field_class(default=TestStates.START)
+
+            class Meta:
+                app_label = 'cycle'
+
+        return TestModel
+
+    def test_default_validator_is_graph(self):
+        field = StateField(default=TestStates.START)
+        self.assertIs(field.validator, field.graph)
+
+    def test_legacy_checker_runs_through_adapter(self):
+        calls = []
+
+        class CountingChecker(StateTransitionsChecker):
+            def check_default_scenario(self):
+                calls.append((self.current_state, self.new_state))
+                return True
+
+        class CountingStateField(StateField):
+            transitions_checker = CountingChecker
+
+        model = self.make_model(CountingStateField)()
+        self.assertIsInstance(model._meta.get_field('state').validator, CheckerAdapter)
+        model.state = TestStates.END
+        self.assertEqual(calls, [(TestStates.START, TestStates.END)])
+
+    def test_custom_validator_built_once(self):
+        built = []
+
+        class NoReturnStateField(StateField):
+            def get_transitions_validator(self):
+                built.append(self)
+                return lambda current, new: new != TestStates.START
+
+        model = self.make_model(NoReturnStateField)()
+        model.state = TestStates.END
+        model.state = TestStates.MIDDLE
+        with self.assertRaises(ValidationError):
+            model.state = TestStates.START
+        self.assertEqual(len(built), 1)
+
+
+class TestBulkTransitions(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        class BulkModel(models.Model):
+            state = StateField(  # type: ignore
+                default=TestStates.START,
+                rules=[
+                    (TestStates.START, [TestStates.MIDDLE, TestStates.END]),
+                    (TestStates.MIDDLE, [TestStates.END]),
+                    (TestStates.END, None),
+                ],
+            )
+
+            class Meta:
+                app_label = 'cycle'
+
+        cls.model = BulkModel
+        cls.field = BulkModel._meta.get_field('state')
+        with connection.schema_editor() as editor:
+            editor.create_model(BulkModel)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.model)
+
+    def create_rows(self, *states):
+        self.model.objects.bulk_create(self.model() for _ in states)
+        for pk, state in zip(
+            self.model.objects.order_by('pk').values_list('pk', flat=True), states
+        ):
+            self.model.objects.filter(pk=pk).update(state=state)
+
+    def states(self):
+        return list(self.model.objects.order_by('pk').values_list('state', flat=True))
+
+    def test_loaded_from_db(self):
+        self.create_rows('end', 'middle')
+        with self.assertNumQueries(1):
+            objs = list(self.model.objects.order_by('pk'))
+        self.assertEqual([obj.state for obj in objs], ['end', 'middle'])
+        with self.assertRaises(ValidationError):
+            objs[0].state = TestStates.START
+        objs[1].state = TestStates.END
+        self.assertEqual(objs[1].state, 'end')
+
+    def test_initial_state_in_code(self):
+        with self.assertRaises(ValidationError):
+            self.model(state='bogus')
+        with self.assertRaises(ValidationError):
+            self.model.objects.create(state='bogus')
+        obj = self.model(state=TestStates.MIDDLE)
+        self.assertEqual(obj.state, 'middle')
+        self.assertEqual(self.model().state, 'start')
+
+    def test_unknown_state_loaded_from_db(self):
+        self.create_rows('bogus')
+        self.assertEqual(self.model.objects.get().state, 'bogus')
+        obj = self.model.objects.only('pk').get()
+        self.assertEqual(obj.state, 'bogus')
+
+    def test_from_db_arguments(self):
+        class FetchModeModel(models.Model):
+            state = StateField(  # type: ignore
+                default=TestStates.START,
+                rules=[(TestStates.START, [TestStates.END]), (TestStates.END, None)],
+            )
+
+            class Meta:
+                app_label = 'cycle'
+
+            @classmethod
+            def from_db(cls, db, field_names, values, *, fetch_mode=None):
+                obj = super().from_db(db, field_names, values)
+                obj.fetch_mode = fetch_mode
+                return obj
+
+        obj = FetchModeModel.from_db(
+            'default', ['id', 'state'], [1, 'bogus'], fetch_mode='x'
+        )
+        self.assertEqual((obj.state, obj.fetch_mode), ('bogus', 'x'))
+
+    def test_deferred_state_loaded(self):
+        self.create_rows('middle')
+        obj = self.model.objects.only('pk').get()
+        with self.assertNumQueries(1):
+            self.assertEqual(obj.state, 'middle')
+        obj.state = TestStates.END
+        self.assertEqual(obj.state, 'end')
+
+    def test_refresh_from_db(self):
+        self.create_rows('middle')
+        obj = self.model.objects.get()
+        self.model.objects.update(state='start')
+        obj.refresh_from_db()
+        self.assertEqual(obj.state, 'start')
+        self.model.objects.update(state='bogus')
+        obj.refresh_from_db(fields=['state'])
+        self.assertEqual(obj.state, 'bogus')
+
+    def test_sources_for(self):
+        self.assertEqual(
+            self.field.sources_for(TestStates.END), {'start', 'middle', 'any'}
+        )
+        self.assertEqual(self.field.sources_for('middle'), {'start', 'any'})
+        self.assertEqual(self.field.sources_for(TestStates.START), {'any'})
+        with self.assertRaises(TransitionsFieldError):
+            self.field.sources_for('invalid_state')
+
+    def test_validate_batch(self):
+        self.field.validate_batch(
+            [('start', 'middle'), ('middle', 'end'), ('end', 'end'), (None, 'start')]
+        )
+        with self.assertRaises(ValidationError) as cm:
+            self.field.validate_batch(
+                [('start', 'middle'), ('end', 'start'), ('end', 'start')]
+            )
+        self.assertEqual(len(cm.exception.messages), 1)
+        with self.assertRaises(ValidationError) as cm:
+            self.field.validate_batch([(None, 'end'), ('start', 'unknown')])
+        self.assertEqual(len(cm.exception.messages), 2)
+
+    def test_bulk_transition(self):
+        self.create_rows('start', 'middle', 'end', 'any')
+        with self.assertNumQueries(1):
+            updated = self.field.bulk_transition(
+                self.model.objects.all(), TestStates.MIDDLE
+            )
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.states(), ['middle', 'middle', 'end', 'middle'])
+
+    def test_bulk_assign(self):
+        objs = [self.model(), self.model()]
+        self.field.bulk_assign(objs, TestStates.MIDDLE)
+        self.assertEqual([obj.state for obj in objs], ['middle', 'middle'])
+        objs.append(self.model())
+        with self.assertRaises(ValidationError):
+            self.field.bulk_assign(objs, TestStates.START)
+        self.assertEqual([obj.state for obj in objs], ['middle', 'middle', 'start'])
+
+
+class TestCompareAndSet(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        class CasModel(models.Model):
+            state = StateField(  # type: ignore
+                default=TestStates.START,
+                rules=[
+                    (TestStates.START, [TestStates.MIDDLE, TestStates.ANY]),
+                    (TestStates.END, None),
+                ],
+            )
+
+            class Meta:
+                app_label = 'cycle'
+
+        cls.model = CasModel
+        cls.field = CasModel._meta.get_field('state')
+        with connection.schema_editor() as editor:
+            editor.create_model(CasModel)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.model)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.pk = self.model.objects.create().pk
+
+    def test_transition(self):
+        obj = self.model.objects.get(pk=self.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.field.transition(obj, TestStates.MIDDLE))
+        self.assertEqual(obj.state, 'middle')
+        self.assertEqual(self.model.objects.get(pk=self.pk).state, 'middle')
+
+    def test_stale_state_loses(self):
+        obj = self.model.objects.get(pk=self.pk)
+        self.model.objects.filter(pk=self.pk).update(state='end')
+        self.assertFalse(self.field.transition(obj, TestStates.MIDDLE))
+        self.assertEqual(obj.state, 'end')
+        with self.assertRaises(ValidationError):
+            self.field.transition(obj, TestStates.START)
+
+    def test_unsaved_instance(self):
+        obj = self.model()
+        with self.assertNumQueries(0), self.assertRaises(ValueError):
+            self.field.transition(obj, TestStates.MIDDLE)
+        self.assertEqual(obj.state, 'start')
+        with self.assertRaises(ValueError):
+            self.field.transition(self.model(pk=self.pk), TestStates.MIDDLE)
+
+    def test_concurrent_transitions(self):
+        workers = 8
+        barrier = Barrier(workers)
+
+        def worker(new_state):
+            try:
+                obj = self.model.objects.get(pk=self.pk)
+                barrier.wait()
+                return self.field.transition(obj, new_state)
+            finally:
+                connections.close_all()
+
+        targets = [TestStates.MIDDLE, TestStates.ANY] * (workers // 2)
+        with ThreadPoolExecutor(workers) as executor:
+            results = list(executor.map(worker, targets))
+        self.assertEqual(results.count(True), 1)
+        winner = targets[results.index(True)]
+        self.assertEqual(self.model.objects.get(pk=self.pk).state, winner)
+
+
 class TestGetTransitionRules(TestCase):
     def test_get_transition_rules(self):
         rules = [
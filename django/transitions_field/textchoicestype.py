@@ -1,18 +1,24 @@
 from collections.abc import Iterable
+from functools import lru_cache
 from typing import Any
 
 from django.db.models import TextChoices
 
 
+@lru_cache(maxsize=256)
+def _is_choices_type(instance_type: type) -> bool:
+    # Экземпляр класса перечисления — всегда его элемент, поэтому
+    # достаточно проверить тип один раз
+    return issubclass(instance_type, TextChoices) and isinstance(
+        instance_type, Iterable
+    )
+
+
 class _TextChoiceMeta(type):
     """Метакласс для проверки типов choices."""
 
     def __instancecheck__(cls, instance: Any) -> bool:
-        return (
-            isinstance(instance, TextChoices)
-            and isinstance(type(instance), Iterable)
-            and instance in type(instance)
-        )
+        return _is_choices_type(type(instance))
 
 
 class TextChoiceType(metaclass=_TextChoiceMeta):
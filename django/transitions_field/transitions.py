@@ -1,24 +1,71 @@
-from collections.abc import Sequence
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache, wraps
+from threading import local
 from types import EllipsisType
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+if TYPE_CHECKING:
+    from .history import TransitionHistory
+    from .metrics import TransitionMetrics
 
 
 __all__ = [
     'TransitionRule',
     'StateField',
+    'StateDescriptor',
     'StateTransitionsChecker',
     'TransitionsCheckerProtocol',
+    'TransitionsGraph',
+    'TransitionsValidatorProtocol',
+    'CheckerAdapter',
 ]
 
 
+CHOICES_CACHE_SIZE = 256
+
+
 class TransitionsFieldError(Exception):
     """Exception for state transition errors"""
 
 
+@dataclass(frozen=True, slots=True)
+class ChoicesTable:
+    """
+    Precomputed lookups for a TextChoices class: `ordinals` maps values and
+    members to their position, `members` holds the interned enum members.
+    """
+
+    members: tuple[models.TextChoices, ...]
+    ordinals: Mapping[str, int]
+
+    @property
+    def values(self) -> Iterable[str]:
+        return self.ordinals.keys()
+
+    def member(self, value: str) -> models.TextChoices:
+        """Returns the member for a value (or a member), like `choices_class(value)`."""
+        try:
+            return self.members[self.ordinals[value]]
+        except (KeyError, TypeError):
+            raise ValueError(f'Invalid value: {value!r}') from None
+
+
+@lru_cache(maxsize=CHOICES_CACHE_SIZE)
+def get_choices_table(choices_class: type[models.TextChoices]) -> ChoicesTable:
+    members = tuple(choices_class)
+    return ChoicesTable(
+        members=members,
+        ordinals={member.value: i for i, member in enumerate(members)},
+    )
+
+
 type TransitionTargetType = (
     Sequence[str | models.TextChoices] | list[EllipsisType] | None
 )
@@ -71,11 +118,7 @@ class TransitionRuleAdapter:
         return cls(blind_value, choices_class).adapt()
 
     def _convert_to_valid_type(self, value) -> models.TextChoices:
-        if isinstance(value, self.choices_class):
-            return value
-        if isinstance(value, str):
-            return self.choices_class(value)
-        raise ValueError(f'Invalid value: {value!r}')
+        return get_choices_table(self.choices_class).member(value)
 
     def adapt(self) -> TransitionRule:
         return TransitionRule(
@@ -118,11 +161,12 @@ class StateTransitionsChecker:
     rules: Sequence[TransitionRule] | None = None
 
     def __post_init__(self) -> None:
-        if self.new_state not in self.choices_class:
+        ordinals = get_choices_table(self.choices_class).ordinals
+        if self.new_state not in ordinals:
             raise TransitionsFieldError(
                 f'New state {self.new_state!r} is not in the choices class'
             )
-        if self.current_state not in self.choices_class:
+        if self.current_state not in ordinals:
             raise TransitionsFieldError(
                 f'Current state {self.current_state!r} is not in the choices class'
             )
@@ -135,10 +179,8 @@ class StateTransitionsChecker:
         Checks if the new state follows the current state in order.
         Called if state_checker is not set.
         """
-        choices = self.choices_class.names
-        new_state_index = choices.index(self.new_state.name)
-        current_state_index = choices.index(self.current_state.name)
-        return new_state_index - current_state_index == 1
+        ordinals = get_choices_table(self.choices_class).ordinals
+        return ordinals[self.new_state] - ordinals[self.current_state] == 1
 
     def __call__(self) -> bool:
         if self.rules is None:
@@ -153,9 +195,215 @@ class StateTransitionsChecker:
         )
 
 
+@dataclass(frozen=True, slots=True)
+class TransitionsGraph:
+    """
+    Transition rules compiled into an adjacency table.
+
+    `targets` maps every state value to the frozenset of values it can be
+    changed to, or to `None` if any state is allowed. Checking a transition
+    is a single dict lookup plus a set membership test, whatever the number
+    of states and rules.
+
+    Multi-step queries (`reachable`, `shortest_path`) run a breadth-first
+    search once per start state and cache the resulting paths.
+    """
+
+    targets: Mapping[str, frozenset[str] | None]
+    _paths: dict[str, dict[str, tuple[str, ...]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def compile(
+        cls,
+        choices_class: type[models.TextChoices],
+        rules: Iterable[TransitionRule] | None = None,
+    ) -> 'TransitionsGraph':
+        """
+        Builds the table with the same semantics as `StateTransitionsChecker`:
+        without rules each state can only be followed by the next one, states
+        without rules allow any transition, and several rules for the same
+        start state must all allow the target.
+        """
+        values = list(get_choices_table(choices_class).values)
+        if rules is None:
+            targets = dict.fromkeys(values, frozenset())
+            for current, new in zip(values, values[1:]):
+                targets[current] = frozenset((new,))
+            return cls(targets)
+
+        targets = dict.fromkeys(values)
+        for rule in rules:
+            start = str(rule.start_state)
+            if rule.target_states is None:
+                allowed = frozenset()
+            elif rule.target_states == [...]:
+                allowed = None
+            else:
+                allowed = frozenset(str(state) for state in rule.target_states)
+            if start not in targets or (allowed and not allowed <= targets.keys()):
+                raise ValueError(f'Invalid rule: {rule!r}')
+            previous = targets[start]
+            if allowed is not None:
+                targets[start] = allowed if previous is None else previous & allowed
+        return cls(targets)
+
+    def allowed(self, current_state: str, new_state: str) -> bool:
+        """Checks if `current_state` can be changed to `new_state`."""
+        if new_state not in self.targets:
+            raise TransitionsFieldError(
+                f'New state {new_state!r} is not in the choices class'
+            )
+        try:
+            allowed = self.targets[current_state]
+        except KeyError:
+            raise TransitionsFieldError(
+                f'Current state {current_state!r} is not in the choices class'
+            ) from None
+        return allowed is None or new_state in allowed
+
+    __call__ = allowed
+
+    def as_dict(self) -> dict[str, list[str] | None]:
+        """
+        Serializable adjacency in choices order, e.g. for migrations:
+        `{state: [allowed states] | None}`, where `None` means any state.
+        """
+        return {
+            state: None
+            if allowed is None
+            else [target for target in self.targets if target in allowed]
+            for state, allowed in self.targets.items()
+        }
+
+    def _paths_from(self, state: str) -> dict[str, tuple[str, ...]]:
+        """Shortest paths from `state` to every state reachable from it."""
+        try:
+            return self._paths[state]
+        except KeyError:
+            pass
+        if state not in self.targets:
+            raise TransitionsFieldError(f'State {state!r} is not in the choices class')
+        paths = {state: (state,)}
+        queue = deque(paths)
+        while queue:
+            current = queue.popleft()
+            allowed = self.targets[current]
+            # Обходим в порядке choices, чтобы из равных путей выбирался один и тот же
+            for new in self.targets:
+                if new not in paths and (allowed is None or new in allowed):
+                    paths[new] = (*paths[current], new)
+                    queue.append(new)
+        self._paths[state] = paths
+        return paths
+
+    def reachable(self, state: str) -> frozenset[str]:
+        """States reachable from `state` in any number of steps, itself included."""
+        return frozenset(self._paths_from(state))
+
+    def can_reach(self, current_state: str, target_state: str) -> bool:
+        return target_state in self._paths_from(current_state)
+
+    def shortest_path(
+        self, current_state: str, target_state: str
+    ) -> tuple[str, ...] | None:
+        """
+        Returns the shortest sequence of states from `current_state` to
+        `target_state` (both included), or `None` if it is unreachable.
+        """
+        return self._paths_from(current_state).get(target_state)
+
+    def allows_path(self, states: Iterable[str]) -> bool:
+        """Checks that every step of the sequence of states is allowed."""
+        states = list(states)
+        return all(
+            current == new or self.allowed(current, new)
+            for current, new in zip(states, states[1:])
+        )
+
+
+class TransitionsValidatorProtocol(Protocol):
+    """Stateless check built once per field: `(current, new) -> bool`."""
+
+    def __call__(self, current_state: str, new_state: str) -> bool: ...
+
+
+@dataclass(frozen=True, slots=True)
+class CheckerAdapter:
+    """Runs a `TransitionsCheckerProtocol` class as a stateless validator."""
+
+    checker_class: type[TransitionsCheckerProtocol]
+    choices_class: type[models.TextChoices]
+    rules: Sequence[TransitionRule] | None = None
+
+    def __call__(self, current_state: str, new_state: str) -> bool:
+        checker = self.checker_class(
+            choices_class=self.choices_class,
+            current_state=current_state,  # type: ignore
+            new_state=new_state,  # type: ignore
+            rules=self.rules,
+        )
+        return checker()
+
+
+class _Hydration(local):
+    """Set while `from_db` or `refresh_from_db` loads rows in this thread."""
+
+    active = False
+
+
+_hydration = _Hydration()
+
+
+def _hydrating(method):
+    """Wraps a model method to mark values it loads from database rows."""
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        # Вызовы вкладываются: refresh_from_db() сам вызывает from_db()
+        previous, _hydration.active = _hydration.active, True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _hydration.active = previous
+
+    wrapper.hydrating = True
+    return wrapper
+
+
+class StateDescriptor(DeferredAttribute):
+    """
+    Intercepts assignments to validate state transitions.
+
+    The first assignment to an instance sets the initial state. Values
+    loaded from the database (`from_db`, `refresh_from_db` or a deferred
+    field being loaded) are stored as is, without conversion and
+    validation. Values given in code (`Model(state=...)`,
+    `objects.create()`) are converted with `to_python` and must be in the
+    choices.
+    """
+
+    def __init__(self, field):
+        super().__init__(field)
+        self.attname = field.attname
+
+    def __set__(self, instance, value):
+        data = instance.__dict__
+        if _hydration.active or (
+            self.attname not in data and not instance._state.adding
+        ):
+            data[self.attname] = value
+        elif self.attname in data:
+            self.field._set_value(instance, self.attname, value)
+        else:
+            data[self.attname] = self.field._initial(self.attname, value)
+
+
 class StateField(models.CharField):
     """Field for state transitions"""
 
+    descriptor_class = StateDescriptor
     transitions_checker: type[TransitionsCheckerProtocol] = StateTransitionsChecker
 
     def __init__(
@@ -163,12 +411,19 @@ class StateField(models.CharField):
         *args,
         default: models.TextChoices,
         rules: Sequence | None = None,
+        history: 'TransitionHistory | None' = None,
+        metrics: 'TransitionMetrics | None' = None,
         **kwargs,
     ) -> None:
         kwargs['default'] = default
         super().__init__(*args, **kwargs)
         self._check_statefield_initials()
         self.rules = get_transition_rules(rules, self.choices_class) if rules else None
+        self.graph = TransitionsGraph.compile(self.choices_class, self.rules)
+        self.validator = self.get_transitions_validator()
+        self._sources: dict[str, frozenset[str]] = {}
+        self.history = history
+        self.metrics = metrics
 
     def _check_statefield_initials(self):
         if self.default is None:
@@ -192,20 +447,133 @@ class StateField(models.CharField):
                 f' the longest choice value length (== {max_choice_length})'
             )
 
-    def contribute_to_class(self, cls, name, **kwargs):
-        """Adds property with setter for assignment interception."""
-        # fmt: off
-        super().contribute_to_class(cls, name, **kwargs)
-        setattr(cls, name, property(
-            lambda obj: obj.__dict__.get(name),
-            # Переопределяем сеттер для дескриптора django.db.models
-            lambda obj, value: self._set_value(obj, name, value),
-        ))
-        # fmt: on
+    def get_transitions_validator(self) -> TransitionsValidatorProtocol:
+        """
+        Builds the validator called on every state change. Override it to
+        return any callable `(current_state, new_state) -> bool`.
+        """
+        if self.transitions_checker is StateTransitionsChecker:
+            return self.graph
+        return CheckerAdapter(self.transitions_checker, self.choices_class, self.rules)
+
+    def reachable(self, state: str) -> frozenset[str]:
+        """States reachable from `state` by the field rules, itself included."""
+        return self.graph.reachable(self.to_python(state))
+
+    def shortest_path(
+        self, current_state: str, target_state: str
+    ) -> tuple[str, ...] | None:
+        """Shortest sequence of states between two states by the field rules."""
+        return self.graph.shortest_path(
+            self.to_python(current_state), self.to_python(target_state)
+        )
 
-    def _set_value(self, obj, name, value):
-        """Validates new value before assignment."""
-        old_value = getattr(obj, name, None)
+    def sources_for(self, new_state: str) -> frozenset[str]:
+        """
+        Returns the states that can be changed to `new_state` (reverse
+        adjacency), excluding `new_state` itself. Cached per target state.
+        """
+        new_state = self.to_python(new_state)
+        try:
+            return self._sources[new_state]
+        except KeyError:
+            pass
+        values = get_choices_table(self.choices_class).values
+        if new_state not in values:
+            raise TransitionsFieldError(
+                f'New state {new_state!r} is not in the choices class'
+            )
+        sources = frozenset(
+            state
+            for state in values
+            if state != new_state and self.validator(state, new_state)
+        )
+        self._sources[new_state] = sources
+        return sources
+
+    def validate_batch(self, pairs: Iterable[tuple[str | None, str]]) -> None:
+        """
+        Validates `(old, new)` state pairs at once: every distinct pair is
+        checked only once. Raises `ValidationError` listing denied pairs.
+        """
+        denied = [
+            f'State <{new_value}> cannot be assigned after state <{old_value}>'
+            for old_value, new_value in dict.fromkeys(
+                (old, self.to_python(new)) for old, new in pairs
+            )
+            if not self._allowed_in_batch(old_value, new_value)
+        ]
+        if denied:
+            raise ValidationError(denied)
+
+    def _allowed_in_batch(self, old_value, new_value) -> bool:
+        # Неизвестные статусы (и None вместо статуса) — тоже запрещённая пара
+        try:
+            return self._validate_on_change(old_value, new_value)
+        except TransitionsFieldError:
+            return False
+
+    def bulk_assign(self, objs: Iterable[models.Model], new_state: str) -> list:
+        """
+        Validates and assigns `new_state` to all `objs` in memory, e.g. before
+        `bulk_update`. Nothing is assigned if any transition is denied.
+        """
+        objs = list(objs)
+        new_state = self.to_python(new_state)
+        self.validate_batch((obj.__dict__.get(self.attname), new_state) for obj in objs)
+        for obj in objs:
+            old_value = obj.__dict__.get(self.attname)
+            obj.__dict__[self.attname] = new_state
+            self._record(obj, self.attname, old_value, new_state)
+        return objs
+
+    def bulk_transition(self, queryset: models.QuerySet, new_state: str) -> int:
+        """
+        Moves rows of `queryset` to `new_state` with a single
+        `UPDATE ... WHERE state IN (...)` limited to the states that are allowed
+        to change to it. Rows in other states are left as is.
+        Returns the number of updated rows.
+        """
+        sources = self.sources_for(new_state)
+        if not sources:
+            return 0
+        return queryset.filter(**{f'{self.attname}__in': sources}).update(
+            **{self.attname: self.to_python(new_state)}
+        )
+
+    def transition(self, obj: models.Model, new_state: str) -> bool:
+        """
+        Compare-and-set transition: validates the change from the state of
+        `obj` and issues a single `UPDATE ... WHERE pk = %s AND state = %s`.
+
+        Returns `True` and sets the new state on `obj` if the row still had
+        the old state. Otherwise returns `False`, and the state of `obj` is
+        reloaded from the database on the next access. Raises `ValueError`
+        for an unsaved `obj`: it has no row to update.
+        """
+        if obj.pk is None or obj._state.adding:
+            raise ValueError(
+                f'Cannot transition unsaved {type(obj).__name__} instance'
+            )
+        name = self.attname
+        old_value = getattr(obj, name)
+        new_value = self._validated(name, old_value, new_state)
+        updated = (
+            type(obj)
+            ._base_manager.db_manager(obj._state.db)
+            .filter(pk=obj.pk, **{name: old_value})
+            .update(**{name: new_value})
+        )
+        if not updated:
+            # Другой процесс успел раньше: значение в памяти устарело
+            del obj.__dict__[name]
+            return False
+        obj.__dict__[name] = new_value
+        self._record(obj, name, old_value, new_value)
+        return True
+
+    def _validated(self, name, old_value, value):
+        """Converts and validates the new value, returns it."""
         new_value = self.to_python(value)  # Приводим к строке (как CharField)
         # Вызываем валидатор, только если значение изменилось
         if not self._validate_on_change(old_value, new_value):
@@ -213,8 +581,37 @@ class StateField(models.CharField):
                 f'State <{new_value}> cannot be assigned to field "{name}" '
                 f'after state <{old_value}>'
             )
+        return new_value
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        """Marks values loaded from the database for `StateDescriptor`."""
+        super().contribute_to_class(cls, name, **kwargs)
+        if not getattr(cls.from_db, 'hydrating', False):
+            cls.from_db = classmethod(_hydrating(cls.from_db.__func__))
+        if not getattr(cls.refresh_from_db, 'hydrating', False):
+            cls.refresh_from_db = _hydrating(cls.refresh_from_db)
+
+    def _initial(self, name, value):
+        """Converts the initial state given in code, checks it is a choice."""
+        new_value = self.to_python(value)
+        if new_value is not None and new_value not in self.graph.targets:
+            raise ValidationError(
+                f'State <{new_value}> is not a choice of field "{name}"'
+            )
+        return new_value
+
+    def _set_value(self, obj, name, value):
+        """Validates new value before assignment."""
+        old_value = obj.__dict__[name]
+        new_value = self._validated(name, old_value, value)
         # Присваиваем новое значение
         obj.__dict__[name] = new_value
+        self._record(obj, name, old_value, new_value)
+
+    def _record(self, obj, name, old_value, new_value):
+        """Passes a state change to the transition history, if any."""
+        if self.history is not None and old_value not in (None, new_value):
+            self.history.record(obj, name, old_value, new_value)
 
     def _validate_on_change(self, old_value, new_value) -> bool:
         """Calls validator if value has changed."""
@@ -224,10 +621,13 @@ class StateField(models.CharField):
         if old_value == new_value:
             # Nothing has changed
             return True
-        checker = self.transitions_checker(
-            choices_class=self.choices_class,
-            current_state=old_value,
-            new_state=new_value,
-            rules=self.rules,
+        if self.metrics is None:
+            return self.validator(old_value, new_value)
+        return self.metrics.measure(
+            self.metrics_label, self.validator, old_value, new_value
         )
-        return checker()
+
+    @cached_property
+    def metrics_label(self) -> str:
+        """`app_label.Model.field`, computed once the field is bound to a model."""
+        return str(self)
@@ -1,2 +1,5 @@
 from .core import PullOut
-from .types import Attr, Index, Key
+from .columns import Column
+from .plan import MISSING, PathMissError, PathPlan, compile_path
+from .projection import Projection
+from .types import Attr, Auto, Each, Index, Key, Slice
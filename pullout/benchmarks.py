@@ -0,0 +1,322 @@
+"""
+Micro-benchmarks for pullout.
+
+Run from the repository root:
+
+    python -m pullout.benchmarks
+"""
+
+import json
+import os
+import tempfile
+import tracemalloc
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from timeit import repeat
+from typing import Any
+
+from .cli import extract
+from .core import PullOut
+from .projection import Projection
+from .types import Attr, Index, Key, NonStrSequence, TypeContainer
+from .utils import ArgsProcessor
+
+
+PATH = 'data.user.profile[0].name'
+PAYLOAD = {'data': {'user': {'profile': [{'name': 'John'}]}}}
+
+
+def legacy_pull_out(*args) -> Callable[[Any], Any]:
+    """Pre-plan implementation: prepares args and dispatches on every hop."""
+    prepared = ArgsProcessor(*args).prepare()
+
+    def extract_next(what_to_extract, from_where):
+        if isinstance(what_to_extract, TypeContainer):
+            return what_to_extract(from_where)
+        if isinstance(from_where, Mapping):
+            return Key(what_to_extract)(from_where)
+        if isinstance(from_where, NonStrSequence):
+            return Index(what_to_extract)(from_where)
+        return Attr(what_to_extract)(from_where)
+
+    def extract(obj):
+        for arg in prepared:
+            try:
+                obj = extract_next(arg, obj)
+            except (ValueError, TypeError, KeyError):
+                return None
+            if obj is None:
+                break
+        return obj
+
+    return extract
+
+
+def per_call_ns(stmt: Callable[[], Any], number: int = 100_000) -> float:
+    return min(repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def report(title: str, cases: dict[str, Callable[[], Any]]) -> None:
+    print(title)
+    results = {name: per_call_ns(stmt) for name, stmt in cases.items()}
+    baseline = next(iter(results.values()))
+    for name, ns in results.items():
+        print(f'  {name:<32}{ns:>10.1f} ns/call{baseline / ns:>8.2f}x')
+
+
+def bench_plans() -> None:
+    legacy = legacy_pull_out(PATH)
+    reused = PullOut(PATH)
+    report(
+        f'Extract {PATH!r}, extractor reused',
+        {
+            'legacy From': lambda: legacy(PAYLOAD),
+            'PullOut.From': lambda: reused.From(PAYLOAD),
+            'PathPlan call': lambda: reused.plan(PAYLOAD),
+        },
+    )
+    report(
+        f'Extract {PATH!r}, extractor built per call',
+        {
+            'legacy PullOut(...).From': lambda: legacy_pull_out(PATH)(PAYLOAD),
+            'PullOut(...).From': lambda: PullOut(PATH).From(PAYLOAD),
+        },
+    )
+
+
+def bench_batches(size: int = 100_000) -> None:
+    records = [PAYLOAD] * size
+    extractor = PullOut(PATH)
+
+    def from_loop():
+        return [extractor.From(record) for record in records]
+
+    print(f'Extract {PATH!r} from {size} records')
+    for name, stmt in {
+        'From in a loop': from_loop,
+        'ListFrom': lambda: extractor.ListFrom(records),
+        'FromMany consumed': lambda: list(extractor.FromMany(records)),
+    }.items():
+        ns = per_call_ns(stmt, number=1) / size
+        print(f'  {name:<32}{ns:>10.1f} ns/record')
+
+
+def bench_projection() -> None:
+    document = {
+        'data': {
+            'user': {
+                'profile': {f'field_{i}': i for i in range(15)},
+            },
+        },
+    }
+    paths = {f'field_{i}': f'data.user.profile.field_{i}' for i in range(15)}
+    extractors = {name: PullOut(path) for name, path in paths.items()}
+    project = Projection(paths)
+    report(
+        f'Extract {len(paths)} fields sharing a prefix',
+        {
+            'PullOut per field': lambda: {
+                name: extractor.From(document)
+                for name, extractor in extractors.items()
+            },
+            'Projection': lambda: project.From(document),
+        },
+    )
+
+
+def bench_threads(size: int = 50_000, workers: tuple[int, ...] = (1, 2, 4, 8)) -> None:
+    extractor = PullOut(PATH)
+    chunks = [[PAYLOAD] * (size // 64)] * 64
+
+    def work(chunk):
+        return extractor.ListFrom(chunk)
+
+    print(f'Shared extractor over {size} records in a thread pool')
+    for max_workers in workers:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            started = perf_counter()
+            for _ in executor.map(work, chunks):
+                pass
+            elapsed = perf_counter() - started
+        print(f'  {max_workers:>2} thread(s){size / elapsed:>27,.0f} records/s')
+
+
+def bench_columns(size: int = 100_000) -> None:
+    records = [
+        {'id': i, 'order': {'price': i * 0.5, 'paid': i % 2 == 0}} for i in range(size)
+    ]
+    paths = {'id': 'id', 'price': 'order.price', 'paid': 'order.paid'}
+    extractors = {name: PullOut(path) for name, path in paths.items()}
+    project = Projection(paths)
+
+    print(f'Extract {len(paths)} columns from {size} records')
+    for name, stmt in {
+        'ListFrom per path': lambda: {
+            name: extractor.ListFrom(records) for name, extractor in extractors.items()
+        },
+        'Projection.ListFrom': lambda: project.ListFrom(records),
+        'Projection.ColumnsFrom': lambda: project.ColumnsFrom(records),
+    }.items():
+        ns = per_call_ns(stmt, number=1) / size
+        print(f'  {name:<32}{ns:>10.1f} ns/record')
+
+
+def measure(func: Callable[[], Any]) -> tuple[float, int]:
+    """Returns seconds spent and peak of allocated memory."""
+    started = perf_counter()
+    func()
+    elapsed = perf_counter() - started
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_stream(size: int = 200_000) -> None:
+    document = {
+        'meta': {'count': size},
+        'items': [{'id': i, 'tags': ['a', 'b'], 'price': i * 0.5} for i in range(size)],
+        'summary': {'total': size * 10},
+    }
+    paths = ('meta.count', 'summary.total', 'items[-1].id')
+    with tempfile.TemporaryFile('w+b') as file:
+        file.write(json.dumps(document).encode())
+        print(f'Extract {paths} from {file.tell() / 2**20:.1f} MiB of JSON')
+        del document
+
+        def loaded():
+            file.seek(0)
+            obj = json.load(file)
+            return [PullOut(path).From(obj) for path in paths]
+
+        def streamed():
+            file.seek(0)
+            return Projection(dict(zip(paths, paths))).FromStream(file)
+
+        for name, func in {
+            'json.load + PullOut.From': loaded,
+            'Projection.FromStream': streamed,
+        }.items():
+            elapsed, peak = measure(func)
+            print(f'  {name:<32}{elapsed:>8.3f} s{peak / 2**20:>10.1f} MiB peak')
+
+
+def bench_ndjson(size: int = 200_000) -> None:
+    specs = (('id', 'id'), ('price', 'order.price'), ('user', 'order.user.name'))
+    with tempfile.TemporaryFile('w+b') as file:
+        for i in range(size):
+            record = {'id': i, 'order': {'price': i / 2, 'user': {'name': f'u{i}'}}}
+            file.write(json.dumps(record).encode() + b'\n')
+        print(f'Extract {len(specs)} paths from {size} NDJSON lines')
+
+        def naive():
+            file.seek(0)
+            extractors = [PullOut(path) for _, path in specs]
+            with open(os.devnull, 'w') as output:
+                for line in file:
+                    record = json.loads(line)
+                    print(*(e.From(record) for e in extractors), sep='\t', file=output)
+
+        def chunked(jobs):
+            file.seek(0)
+            with open(os.devnull, 'w') as output:
+                extract([file], output, specs, jobs=jobs)
+
+        for name, func in {
+            'naive loop': naive,
+            'extract, 1 process': lambda: chunked(1),
+            f'extract, {os.cpu_count()} processes': lambda: chunked(os.cpu_count()),
+        }.items():
+            started = perf_counter()
+            func()
+            elapsed = perf_counter() - started
+            print(f'  {name:<32}{size / elapsed:>12,.0f} records/s')
+
+
+@dataclass
+class DataUser:
+    name: str
+    tags: list[str]
+
+
+class SlotsUser:
+    __slots__ = ('name', 'tags')
+
+    def __init__(self, name: str, tags: list[str]) -> None:
+        self.name, self.tags = name, tags
+
+
+def django_user() -> Any | None:
+    """Returns an unsaved Django model instance, if Django is installed."""
+    try:
+        import django
+        from django.conf import settings
+    except ImportError:
+        return None
+    if not settings.configured:
+        settings.configure(INSTALLED_APPS=['django.contrib.contenttypes'])
+        django.setup()
+    from django.db import models
+
+    class User(models.Model):
+        name = models.CharField(max_length=10)
+        tags = models.JSONField()
+
+        class Meta:
+            app_label = 'pullout_benchmarks'
+
+    return User(name='John', tags=['a', 'b'])
+
+
+def bench_dispatch() -> None:
+    targets = {
+        'dict': {'user': {'name': 'John', 'tags': ['a', 'b']}},
+        'list': {'user': [['John'], ('a', 'b')]},
+        'dataclass': {'user': DataUser('John', ['a', 'b'])},
+        '__slots__': {'user': SlotsUser('John', ['a', 'b'])},
+    }
+    if (user := django_user()) is not None:
+        targets['Django model'] = {'user': user}
+    for name, target in targets.items():
+        path = 'user.1.1' if name == 'list' else 'user.tags.1'
+        legacy, extractor = legacy_pull_out(path), PullOut(path)
+        report(
+            f'Extract {path!r} through {name}',
+            {
+                'legacy From': lambda: legacy(target),
+                'PullOut.From': lambda: extractor.From(target),
+            },
+        )
+
+
+def bench_misses() -> None:
+    sparse = {'data': {'items': [{'id': 1}], 'user': None}}
+    for path in ('data.items.first.price', 'data.user.name', 'data.items.0.price'):
+        legacy = legacy_pull_out(path)
+        plain = PullOut(path)
+        with_default = PullOut(path, default=0)
+        with_sentinel = PullOut(path, on_miss='sentinel')
+        report(
+            f'Missed {path!r}',
+            {
+                'legacy From': lambda: legacy(sparse),
+                'PullOut.From': lambda: plain.From(sparse),
+                'PullOut.From, default': lambda: with_default.From(sparse),
+                'PullOut.From, sentinel': lambda: with_sentinel.From(sparse),
+            },
+        )
+
+
+if __name__ == '__main__':
+    bench_plans()
+    bench_dispatch()
+    bench_misses()
+    bench_batches()
+    bench_projection()
+    bench_columns()
+    bench_threads()
+    bench_stream()
+    bench_ndjson()
@@ -0,0 +1,196 @@
+"""
+Bulk extraction of pullout paths from NDJSON (JSON Lines).
+
+    python -m pullout -p id -p price=order.price logs.ndjson > out.tsv
+    zcat logs.ndjson.gz | python -m pullout -p id -f ndjson -j 8
+
+Input is read in large chunks of whole lines, each chunk is parsed and
+projected at once (optionally in a process pool), and output is written
+chunk by chunk. Throughput is reported to stderr.
+"""
+
+import argparse
+import json
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from time import perf_counter
+from typing import IO, Any
+
+from .projection import Projection
+
+
+CHUNK_SIZE = 1 << 22
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# ((name, path), ...)
+PathSpecs = tuple[tuple[str, str], ...]
+
+
+def parse_path_spec(spec: str) -> tuple[str, str]:
+    name, sep, path = spec.partition('=')
+    return (name, path) if sep else (spec, spec)
+
+
+@lru_cache(maxsize=8)
+def get_projection(specs: PathSpecs) -> Projection:
+    return Projection(dict(specs))
+
+
+def jsonable(value: Any) -> Any:
+    return list(value) if isinstance(value, Iterator) else value
+
+
+def tsv_field(value: Any) -> str:
+    if value is None:
+        return ''
+    if type(value) is str:
+        return value.translate(TSV_ESCAPES)
+    if type(value) is int or type(value) is float:
+        return repr(value)
+    return json.dumps(jsonable(value), ensure_ascii=False).translate(TSV_ESCAPES)
+
+
+def process_chunk(
+    lines: list[bytes], specs: PathSpecs, output_format: str
+) -> tuple[str, int, int]:
+    """Returns output text, number of records and number of broken lines."""
+    project = get_projection(specs)
+    decode = json.JSONDecoder().decode
+    out, records, broken = [], 0, 0
+    # Decoding the chunk at once is cheaper than json.loads() on each bytes line
+    for line in b''.join(lines).decode('utf-8', 'replace').split('\n'):
+        if not line or line.isspace():
+            continue
+        try:
+            row = project.From(decode(line))
+        except ValueError:
+            broken += 1
+            continue
+        records += 1
+        if output_format == 'tsv':
+            out.append('\t'.join(map(tsv_field, row.values())))
+        else:
+            out.append(
+                json.dumps(
+                    {name: jsonable(value) for name, value in row.items()},
+                    ensure_ascii=False,
+                )
+            )
+    out.append('')
+    return '\n'.join(out) if records else '', records, broken
+
+
+def read_chunks(files: Iterable[IO[bytes]], chunk_size: int) -> Iterator[list[bytes]]:
+    for file in files:
+        while lines := file.readlines(chunk_size):
+            yield lines
+
+
+def run_chunks(
+    chunks: Iterable[list[bytes]], specs: PathSpecs, output_format: str, jobs: int
+) -> Iterator[tuple[str, int, int]]:
+    if jobs <= 1:
+        for lines in chunks:
+            yield process_chunk(lines, specs, output_format)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Bounded number of chunks in flight, results in input order
+        pending: deque[Future] = deque()
+        for lines in chunks:
+            pending.append(executor.submit(process_chunk, lines, specs, output_format))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def extract(
+    files: Iterable[IO[bytes]],
+    output: IO[str],
+    specs: PathSpecs,
+    output_format: str = 'tsv',
+    jobs: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    header: bool = False,
+) -> tuple[int, int]:
+    """Writes extracted values, returns numbers of records and broken lines."""
+    if header and output_format == 'tsv':
+        output.write('\t'.join(name for name, _ in specs) + '\n')
+    records = broken = 0
+    for text, chunk_records, chunk_broken in run_chunks(
+        read_chunks(files, chunk_size), specs, output_format, jobs
+    ):
+        output.write(text)
+        records += chunk_records
+        broken += chunk_broken
+    return records, broken
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m pullout',
+        description='Extract pullout paths from NDJSON (JSON Lines) records.',
+    )
+    parser.add_argument(
+        'files', nargs='*', default=['-'], help='input files, "-" for stdin'
+    )
+    parser.add_argument(
+        '-p', '--path', dest='paths', action='append', required=True,
+        metavar='[NAME=]PATH', help='path to extract, may be repeated',
+    )
+    parser.add_argument(
+        '-f', '--format', choices=('tsv', 'ndjson'), default='tsv',
+        help='output format (default: tsv)',
+    )
+    parser.add_argument(
+        '--header', action='store_true', help='write column names for TSV'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='number of processes to parse chunks in (default: 1)',
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=CHUNK_SIZE,
+        help=f'approximate chunk size in bytes (default: {CHUNK_SIZE})',
+    )
+    parser.add_argument(
+        '-q', '--quiet', action='store_true', help="don't report throughput"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    specs = tuple(parse_path_spec(spec) for spec in args.paths)
+    names = [name for name, _ in specs]
+    if duplicates := sorted({name for name in names if names.count(name) > 1}):
+        # Projection keeps one path per name, the TSV header would not match
+        parser.error(f'duplicate path names: {", ".join(duplicates)}')
+    with ExitStack() as stack:
+        try:
+            files = [
+                sys.stdin.buffer if name == '-' else stack.enter_context(open(name, 'rb'))
+                for name in args.files
+            ]
+        except OSError as e:
+            # Files opened so far are closed by the ExitStack
+            parser.error(f"can't open '{e.filename}': {e.strerror}")
+        started = perf_counter()
+        records, broken = extract(
+            files, sys.stdout, specs, args.format, args.jobs, args.chunk_size,
+            args.header,
+        )
+    elapsed = perf_counter() - started
+    if not args.quiet:
+        print(
+            f'{records} records in {elapsed:.2f} s '
+            f'({records / elapsed if elapsed else 0:,.0f} records/s), '
+            f'{broken} broken lines',
+            file=sys.stderr,
+        )
+    return 0
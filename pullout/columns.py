@@ -0,0 +1,104 @@
+from array import array
+from dataclasses import dataclass
+from typing import Any
+
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# Exact types only: subclasses (e.g. enums) go to object columns
+TYPECODES = {bool: 'b', int: 'q', float: 'd'}
+TYPECODE_RANKS = {'b': 0, 'q': 1, 'd': 2}
+KINDS = {'b': 'bool', 'q': 'int', 'd': 'float', None: 'object'}
+NUMPY_DTYPES = {'b': 'int8', 'q': 'int64', 'd': 'float64'}
+
+
+@dataclass(frozen=True, slots=True)
+class Column:
+    """
+    Extracted values of a single path over a batch of objects.
+
+    - `kind` - one of `bool`, `int`, `float` or `object`
+    - `values` - for numeric kinds a NumPy array (if NumPy is installed) or
+      `array.array` (typecode `b` with 0/1 for booleans, `q` for integers,
+      `d` for floats); a list for objects
+    - `valid` - validity mask, false where the path was missed (None);
+      a NumPy bool array or a `bytearray` of 0/1
+
+    Missed items hold zeros in numeric columns and None in object columns.
+    """
+
+    name: str
+    kind: str
+    values: Any
+    valid: Any
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+
+class ColumnBuilder:
+    """
+    Accumulates values into the most compact column type seen so far:
+    bool, int and float arrays, or a list once a non-numeric value comes.
+    """
+
+    __slots__ = ('typecode', 'values', 'valid')
+
+    def __init__(self) -> None:
+        self.typecode: str | None = 'b'
+        self.values: array | list = array('b')
+        self.valid = bytearray()
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.valid.append(0)
+            self.values.append(None if self.typecode is None else 0)
+            return
+        self.valid.append(1)
+        if self.typecode is None:
+            self.values.append(value)
+            return
+        typecode = TYPECODES.get(type(value))
+        if typecode is None:
+            self._to_objects()
+        elif TYPECODE_RANKS[typecode] > TYPECODE_RANKS[self.typecode]:
+            self.typecode = typecode
+            self.values = array(typecode, self.values)
+        try:
+            self.values.append(value)
+        except OverflowError:  # integer doesn't fit into int64
+            self._to_objects()
+            self.values.append(value)
+
+    def _to_objects(self) -> None:
+        cast = bool if self.typecode == 'b' else None
+        self.values = [
+            (cast(value) if cast else value) if valid else None
+            for value, valid in zip(self.values, self.valid)
+        ]
+        self.typecode = None
+
+    def build(self, name: str, use_numpy: bool | None = None) -> Column:
+        """
+        Returns the column. NumPy arrays are used if `use_numpy` is true,
+        or if it is None (default) and NumPy is installed.
+        """
+        kind = KINDS[self.typecode]
+        if use_numpy is None:
+            use_numpy = np is not None
+        if not use_numpy:
+            return Column(name, kind, self.values, self.valid)
+        if np is None:
+            raise ImportError('use_numpy=True requires NumPy to be installed')
+        valid = np.frombuffer(self.valid, dtype=np.bool_)
+        if self.typecode is None:
+            return Column(name, kind, self.values, valid)
+        # Numeric arrays are shared with NumPy without copying
+        values = np.frombuffer(self.values, dtype=NUMPY_DTYPES[self.typecode])
+        if self.typecode == 'b':
+            values = values.astype(np.bool_)
+        return Column(name, kind, values, valid)
@@ -1,37 +1,87 @@
-from collections.abc import Mapping, MutableSequence
+from array import array
+from collections.abc import Iterable, Iterator, Sized
+from itertools import repeat
 from typing import Any
 
-from .types import Attr, Index, Key, TypeContainer
-from .utils import ArgsProcessor
+from .plan import MISSING, PathMissError, check_miss_policy, compile_path
+from .stream import CHUNK_SIZE, JSONStream
 
 
-NonStrSequence = MutableSequence | tuple
+class PullOut:
+    """
+    Extracts a value by the path given as arguments.
 
+    Extraction keeps no per-call state on the instance, so a single `PullOut`
+    can be shared between threads and asyncio tasks.
 
-class PullOut:
-    def __init__(self, *args) -> None:
-        self.args = ArgsProcessor(*args).prepare()
+    If the path is not found, the result depends on `on_miss` policy:
+    - `'default'` - return `default` (None unless given)
+    - `'raise'` - raise `PathMissError`
+    - `'sentinel'` - return `MISSING`, which tells a missed path
+      from a found None
+    """
+
+    __slots__ = ('plan', 'args', 'default', 'on_miss', '_missing')
+
+    def __init__(self, *args, default: Any = None, on_miss: str = 'default') -> None:
+        check_miss_policy(on_miss)
+        self.plan = compile_path(*args)
+        self.args = self.plan.args
+        self.default = default
+        self.on_miss = on_miss
+        self._missing = default if on_miss == 'default' else MISSING
 
     def From(self, object_from) -> Any:  # noqa: N802 (Ruff)
-        self.obj = object_from
-        return self._extract_args()
-
-    def _extract_next(self, what_to_extract: Any, from_where: Any) -> Any:
-        if isinstance(what_to_extract, TypeContainer):
-            return what_to_extract(from_where)
-        if isinstance(from_where, Mapping):
-            return Key(what_to_extract)(from_where)
-        if isinstance(from_where, NonStrSequence):
-            return Index(what_to_extract)(from_where)
-        return Attr(what_to_extract)(from_where)
-
-    def _extract_args(self) -> Any | None:
-        _obj = self.obj
-        for arg in self.args:
-            try:
-                _obj = self._extract_next(arg, _obj)
-            except (ValueError, TypeError, KeyError):
-                return None
-            if _obj is None:
-                break
-        return _obj
+        return self._extract_args(object_from)
+
+    def FromMany(self, objects: Iterable) -> Iterator[Any]:  # noqa: N802 (Ruff)
+        """Lazily extracts the value from each of the objects."""
+        if self.on_miss == 'raise':
+            return map(self.From, objects)
+        return map(self.plan, objects, repeat(self._missing))
+
+    def ListFrom(self, objects: Iterable) -> list[Any]:  # noqa: N802 (Ruff)
+        """Extracts the value from each of the objects into a list."""
+        # list() presizes itself by the length (or length hint) of the map
+        return list(self.FromMany(objects))
+
+    def ArrayFrom(  # noqa: N802 (Ruff)
+        self, objects: Iterable, typecode: str = 'd', missing: Any = 0
+    ) -> array:
+        """
+        Extracts numeric values from each of the objects into an `array.array`
+        of the given typecode. Misses give `default` as in `ListFrom`, and
+        values that still can't be stored (None, `MISSING`) are replaced
+        with `missing`.
+        """
+        values = self.FromMany(objects)
+        if not isinstance(objects, Sized):
+            return array(
+                typecode,
+                (
+                    missing if value is None or value is MISSING else value
+                    for value in values
+                ),
+            )
+        result = array(typecode, (missing,)) * len(objects)
+        for i, value in enumerate(values):
+            if value is not None and value is not MISSING:
+                result[i] = value
+        return result
+
+    def FromStream(self, source: Any, chunk_size: int = CHUNK_SIZE) -> Any:  # noqa: N802 (Ruff)
+        """
+        Extracts the value from a JSON document without parsing it whole.
+        Source is a file object (binary or text), bytes-like object (e.g. mmap)
+        or string. See `JSONStream` for details.
+        """
+        value = JSONStream(source, chunk_size).extract((self.plan,), self._missing)[0]
+        return self._check_miss(value)
+
+    def _extract_args(self, object_from: Any) -> Any:
+        return self._check_miss(self.plan(object_from, self._missing))
+
+    def _check_miss(self, value: Any) -> Any:
+        if value is MISSING and self.on_miss == 'raise':
+            raise PathMissError(f'Path {self.args!r} is not found')
+        return value
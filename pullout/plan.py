@@ -0,0 +1,182 @@
+from collections.abc import Iterator
+from functools import lru_cache
+from itertools import repeat
+from typing import Any
+
+from .types import Auto, FanOut, TypeContainer
+from .utils import ArgsProcessor
+
+
+PLAN_CACHE_SIZE = 1024
+
+
+class Missing:
+    """Type of the `MISSING` marker, which stands for values not found"""
+
+    __slots__ = ()
+
+    def __new__(cls):
+        return MISSING if 'MISSING' in globals() else super().__new__(cls)
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __reduce__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = Missing()
+
+# What to do when the path is not found: return the default value,
+# raise `PathMissError` or return `MISSING`
+MISS_POLICIES = ('default', 'raise', 'sentinel')
+
+
+class PathMissError(LookupError):
+    """Path is not found (raised with the 'raise' miss policy)"""
+
+
+def check_miss_policy(on_miss: str) -> None:
+    if on_miss not in MISS_POLICIES:
+        raise ValueError(f'on_miss must be one of {MISS_POLICIES}, not {on_miss!r}')
+
+
+class PathPlan:
+    """
+    Compiled, immutable chain of accessors for a single pullout path
+
+    Path spec is prepared by `ArgsProcessor` only once, and each step is
+    turned into a ready-made accessor, so applying the plan does no parsing,
+    no type-marker dispatch and no allocations per step.
+
+    >>> plan = PathPlan(['a', '0', 'b'])
+    >>> plan
+    PathPlan(Auto('a'), Auto('0'), Auto('b'))
+    >>> plan({'a': [{'b': 1}]})
+    1
+
+    A path with fan-out steps (`Each`, `Slice`) gives a lazy iterator over
+    the values found for every item. Several fan-outs are flattened, and a
+    missing value for an item gives None:
+
+    >>> plan = compile_path('a[*].b[1:]')
+    >>> list(plan({'a': [{'b': [1, 2, 3]}, {'c': 4}, {'b': [5, 6]}]}))
+    [2, 3, None, 6]
+
+    Lookups don't raise: on a miss the plan returns the `missing` value,
+    so passing `MISSING` tells a missed path from a present None:
+
+    >>> plan = compile_path('a.b')
+    >>> plan({'a': {'b': None}}, MISSING), plan({'a': {}}, MISSING)
+    (None, MISSING)
+    """
+
+    __slots__ = ('args', 'steps', '_head', '_fan_out', '_tail')
+
+    args: tuple[Any, ...]
+    steps: tuple[TypeContainer, ...]
+
+    def __init__(self, prepared_args) -> None:
+        args = tuple(prepared_args)
+        steps = tuple(
+            arg if isinstance(arg, TypeContainer) else Auto(arg) for arg in args
+        )
+        fan_out_at = next(
+            (i for i, step in enumerate(steps) if isinstance(step, FanOut)), None
+        )
+        setattr_ = object.__setattr__
+        setattr_(self, 'args', args)
+        setattr_(self, 'steps', steps)
+        if fan_out_at is None:
+            setattr_(self, '_head', steps)
+            setattr_(self, '_fan_out', None)
+            setattr_(self, '_tail', None)
+        else:
+            setattr_(self, '_head', steps[:fan_out_at])
+            setattr_(self, '_fan_out', steps[fan_out_at])
+            setattr_(self, '_tail', PathPlan(steps[fan_out_at + 1 :]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    @property
+    def fans_out(self) -> bool:
+        """Whether the plan gives an iterator of values instead of a value."""
+        return self._fan_out is not None
+
+    def __call__(self, obj: Any, missing: Any = None) -> Any:
+        for step in self._head:
+            if obj is None:  # nothing to extract from
+                return missing
+            obj = step.get(obj, MISSING)
+            if obj is MISSING:
+                return missing
+        if self._fan_out is None:
+            return obj
+        items = self._fan(obj, missing)
+        return missing if items is MISSING else items
+
+    def _head_value(self, obj: Any) -> Any:
+        """Returns the value found by the steps before fan-out, or `MISSING`."""
+        for step in self._head:
+            if obj is None:
+                return MISSING
+            obj = step.get(obj, MISSING)
+            if obj is MISSING:
+                return MISSING
+        return obj
+
+    def _fan(self, obj: Any, missing: Any) -> Iterator[Any] | Missing:
+        """
+        Fans out the value found by the head of the path. Returns `MISSING`
+        if it can't be fanned out, or an iterator with `missing` for items
+        where the rest of the path is missed.
+        """
+        if obj is None:
+            return MISSING
+        items = self._fan_out.get(obj, MISSING)
+        if items is MISSING:
+            return MISSING
+        tail = self._tail
+        if not tail.fans_out:
+            return map(tail, items, repeat(missing))
+        return self._flatten(tail, items, missing)
+
+    @staticmethod
+    def _flatten(tail: 'PathPlan', items: Iterator[Any], missing: Any) -> Iterator[Any]:
+        for item in items:
+            values = tail._head_value(item)
+            if values is not MISSING:
+                values = tail._fan(values, missing)
+            if values is MISSING:
+                yield missing
+            else:
+                yield from values
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({", ".join(map(repr, self.steps))})'
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE, typed=True)
+def _compile_cached(args: tuple) -> PathPlan:
+    return PathPlan(ArgsProcessor(*args).prepare())
+
+
+def compile_path(*args) -> PathPlan:
+    """
+    Returns the compiled plan for the path spec given as `PullOut` arguments.
+
+    Plans are interned in an LRU cache keyed by the raw arguments, so the same
+    spec always gives the same plan object. Specs with unhashable parts are
+    compiled every time.
+
+    >>> compile_path('a.b[0].c') is compile_path('a.b[0].c')
+    True
+    """
+    try:
+        return _compile_cached(args)
+    except TypeError:  # unhashable argument, can't be cached
+        return PathPlan(ArgsProcessor(*args).prepare())
@@ -0,0 +1,188 @@
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import make_dataclass
+from typing import Any
+
+from .columns import Column, ColumnBuilder
+from .plan import (
+    MISSING,
+    PathMissError,
+    PathPlan,
+    check_miss_policy,
+    compile_path,
+)
+from .stream import CHUNK_SIZE, JSONStream
+from .types import FanOut, TypeContainer
+
+
+# (
+#   names ending at the node,
+#   ((name, plan of the path rest starting with a fan-out step), ...),
+#   ((step, child node), ...),
+# )
+TrieNode = tuple[
+    tuple[str, ...],
+    tuple[tuple[str, PathPlan], ...],
+    tuple[tuple[TypeContainer, Any], ...],
+]
+
+
+def _compile_spec(spec: Any) -> PathPlan:
+    if isinstance(spec, PathPlan):
+        return spec
+    if isinstance(spec, tuple | list):
+        return compile_path(*spec)
+    return compile_path(spec)
+
+
+class _TrieBuilder:
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.fan_outs: list[tuple[str, PathPlan]] = []
+        self.children: list[tuple[TypeContainer, _TrieBuilder]] = []
+
+    def insert(self, name: str, steps: tuple[TypeContainer, ...]) -> None:
+        node = self
+        for i, step in enumerate(steps):
+            if isinstance(step, FanOut):
+                # Fanned out values are lazy iterators, nothing to share below
+                node.fan_outs.append((name, PathPlan(steps[i:])))
+                return
+            # Linear lookup by equality, so unhashable steps are shared as well
+            for child_step, child in node.children:
+                if child_step == step:
+                    node = child
+                    break
+            else:
+                child = _TrieBuilder()
+                node.children.append((step, child))
+                node = child
+        node.names.append(name)
+
+    def freeze(self) -> TrieNode:
+        return (
+            tuple(self.names),
+            tuple(self.fan_outs),
+            tuple((step, child.freeze()) for step, child in self.children),
+        )
+
+
+class Projection:
+    """
+    Extracts several named paths from the same object in a single traversal.
+
+    Paths are merged into a prefix trie, so every shared prefix is walked
+    only once per object. A path is anything `PullOut` accepts: a string,
+    a tuple of arguments or a compiled `PathPlan`.
+
+    >>> project = Projection({'name': 'user.profile.name', 'age': 'user.profile.age'})
+    >>> project.From({'user': {'profile': {'name': 'John', 'age': 42}}})
+    {'name': 'John', 'age': 42}
+
+    With `record=True` the results are slotted dataclass instances instead
+    of dicts (names then must be valid identifiers):
+
+    >>> Projection({'a': 'a'}, record=True).From({'a': 1})
+    Record(a=1)
+
+    Missed paths are handled by the `default` and `on_miss` policy
+    the same way as in `PullOut` (with `'raise'`, `PathMissError` lists
+    all the missed names).
+    """
+
+    def __init__(
+        self,
+        paths: Mapping[str, Any],
+        record: bool | str = False,
+        default: Any = None,
+        on_miss: str = 'default',
+    ) -> None:
+        check_miss_policy(on_miss)
+        self.default = default
+        self.on_miss = on_miss
+        self._missing = default if on_miss == 'default' else MISSING
+        self.plans = {name: _compile_spec(spec) for name, spec in paths.items()}
+        self.names = tuple(self.plans)
+        builder = _TrieBuilder()
+        for name, plan in self.plans.items():
+            builder.insert(name, plan.steps)
+        self.trie = builder.freeze()
+        self.record_class = (
+            make_dataclass(
+                record if isinstance(record, str) else 'Record',
+                self.names,
+                slots=True,
+            )
+            if record
+            else None
+        )
+
+    def From(self, object_from: Any) -> dict[str, Any] | Any:  # noqa: N802 (Ruff)
+        result = dict.fromkeys(self.names, self._missing)
+        self._walk(self.trie, object_from, result, self._missing)
+        return self._make_result(result)
+
+    def FromStream(  # noqa: N802 (Ruff)
+        self, source: Any, chunk_size: int = CHUNK_SIZE
+    ) -> dict[str, Any] | Any:
+        """
+        Projects a JSON document without parsing it whole, reading it once
+        for all the paths. See `PullOut.FromStream`.
+        """
+        values = JSONStream(source, chunk_size).extract(
+            tuple(self.plans.values()), self._missing
+        )
+        return self._make_result(dict(zip(self.names, values)))
+
+    def _make_result(self, result: dict[str, Any]) -> dict[str, Any] | Any:
+        if self.on_miss == 'raise' and any(v is MISSING for v in result.values()):
+            missed = [name for name, value in result.items() if value is MISSING]
+            raise PathMissError(f'Paths {missed!r} are not found')
+        if self.record_class is None:
+            return result
+        return self.record_class(**result)
+
+    def FromMany(self, objects: Iterable) -> Iterator[dict[str, Any] | Any]:  # noqa: N802 (Ruff)
+        """Lazily projects each of the objects."""
+        return map(self.From, objects)
+
+    def ListFrom(self, objects: Iterable) -> list[dict[str, Any] | Any]:  # noqa: N802 (Ruff)
+        """Projects each of the objects into a list."""
+        return list(map(self.From, objects))
+
+    def ColumnsFrom(  # noqa: N802 (Ruff)
+        self, objects: Iterable, use_numpy: bool | None = None
+    ) -> dict[str, Column]:
+        """
+        Extracts the paths from a batch of objects into one compact column
+        per path (see `Column`), without building a dict per object.
+        """
+        builders = {name: ColumnBuilder() for name in self.names}
+        appenders = tuple(builder.append for builder in builders.values())
+        names, defaults, row = self.names, dict.fromkeys(self.names), {}
+        for obj in objects:
+            row.update(defaults)
+            self._walk(self.trie, obj, row, None)
+            for name, append in zip(names, appenders):
+                append(row[name])
+        return {
+            name: builder.build(name, use_numpy) for name, builder in builders.items()
+        }
+
+    def _walk(
+        self, node: TrieNode, obj: Any, result: dict[str, Any], missing: Any
+    ) -> None:
+        # Result is prefilled with `missing`, only found values are set
+        names, fan_outs, children = node
+        for name in names:
+            result[name] = obj
+        for name, plan in fan_outs:
+            result[name] = plan(obj, missing)
+        if obj is None:  # nothing to extract from
+            return
+        for step, child in children:
+            value = step.get(obj, MISSING)
+            if value is not MISSING:
+                self._walk(child, value, result, missing)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.plans!r})'
@@ -0,0 +1,335 @@
+import codecs
+import json
+import re
+from collections import deque
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from .plan import MISSING, PathPlan
+from .types import Auto, Each, Index, Key, Slice, TypeContainer
+
+
+CHUNK_SIZE = 1 << 16
+
+WS_RE = re.compile(r'[ \t\n\r]*')
+STRING_SPECIALS_RE = re.compile(r'["\\]')
+STRUCTURAL_RE = re.compile(r'["\[\]{}]')
+SCALAR_RE = re.compile(r'[^,:\]}\s]*')
+
+
+class Slot:
+    """
+    Result of a path (or of a fanned out item of a path) being filled
+    while the stream is read.
+    """
+
+    __slots__ = ('value', 'items')
+
+    def __init__(self) -> None:
+        self.value: Any = MISSING
+        self.items: list[Slot] | None = None
+
+    def set_from(self, plan: PathPlan, obj: Any) -> None:
+        """Applies the rest of the path to the already decoded object."""
+        value = plan(obj, MISSING)
+        if plan.fans_out and value is not MISSING:
+            self.items = [_leaf(item) for item in value]
+        else:
+            self.value = value
+
+    def flatten(self, missing: Any) -> Iterator[Any]:
+        if self.items is None:
+            yield missing if self.value is MISSING else self.value
+            return
+        for item in self.items:
+            yield from item.flatten(missing)
+
+    def result(self, fans_out: bool, missing: Any) -> Any:
+        if not fans_out or self.items is None:
+            return missing if self.value is MISSING else self.value
+        return [value for item in self.items for value in item.flatten(missing)]
+
+
+def _leaf(value: Any) -> Slot:
+    slot = Slot()
+    slot.value = value
+    return slot
+
+
+# (slot to fill, steps of the path, index of the next step)
+Matcher = tuple[Slot, tuple[TypeContainer, ...], int]
+
+
+def _chunks(source: Any, chunk_size: int) -> Iterator[str]:
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    if isinstance(source, bytes | bytearray | memoryview) or not hasattr(
+        source, 'read'
+    ):
+        # bytes-like objects, including mmap
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield decoder.decode(view[start : start + chunk_size])
+    else:
+        while chunk := source.read(chunk_size):
+            yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+    if tail := decoder.decode(b'', final=True):
+        yield tail
+
+
+class JSONStream:
+    """
+    Evaluates pullout paths over a JSON document while tokenizing it.
+
+    The document is read in chunks, subtrees which no path can reach are
+    skipped without being decoded, and only matched values are decoded
+    (with `json.loads`). So the memory used is bounded by the extracted
+    values and the chunk size, not by the document size.
+
+    Attributes (`Attr`) never match JSON values. Negative indexes keep
+    only as many trailing array items as needed; slices with negative
+    bounds or step keep the whole array they are applied to.
+    """
+
+    def __init__(self, source: Any, chunk_size: int = CHUNK_SIZE) -> None:
+        self.chunks = _chunks(source, chunk_size)
+        self.buf = ''
+        self.pos = 0
+        self.mark: int | None = None
+
+    def extract(self, plans: Sequence[PathPlan], missing: Any = None) -> list[Any]:
+        """
+        Returns the values found by the plans, in the same order,
+        or `missing` for paths not found.
+        """
+        slots = [Slot() for _ in plans]
+        if self._ws():
+            self._value([(slot, plan.steps, 0) for slot, plan in zip(slots, plans)])
+        return [slot.result(plan.fans_out, missing) for slot, plan in zip(slots, plans)]
+
+    # Buffer
+
+    def _fill(self) -> bool:
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        drop = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[drop:] + chunk
+        self.pos -= drop
+        if self.mark is not None:
+            self.mark -= drop
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f'{message} near {self.buf[self.pos : self.pos + 20]!r}')
+
+    def _ws(self) -> str:
+        """Skips whitespaces and returns the next char ('' at the end)."""
+        while True:
+            self.pos = WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars: str) -> str:
+        char = self._ws()
+        if not char or char not in chars:
+            raise self._error(f'Expected one of {chars!r}')
+        self.pos += 1
+        return char
+
+    # Skipping
+
+    def _skip_string(self) -> None:
+        self.pos += 1  # opening quote
+        while True:
+            match = STRING_SPECIALS_RE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+            elif match.group() == '"':
+                self.pos = match.end()
+                return
+            elif match.end() < len(self.buf):
+                self.pos = match.end() + 1  # escaped char
+                continue
+            else:
+                self.pos = match.start()  # escape is split between chunks
+            if not self._fill():
+                raise self._error('Unterminated string')
+
+    def _skip_container(self, depth: int = 0) -> None:
+        """Skips a container, or the rest of one if `depth` is already 1."""
+        while True:
+            match = STRUCTURAL_RE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise self._error('Unterminated container')
+                continue
+            char = match.group()
+            if char == '"':
+                self.pos = match.start()
+                self._skip_string()
+                continue
+            self.pos = match.end()
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                return
+
+    def _skip_scalar(self) -> None:
+        while True:
+            end = SCALAR_RE.match(self.buf, self.pos).end()
+            if end < len(self.buf) or not self._fill():
+                break
+        if end == self.pos:
+            raise self._error('Expected a value')
+        self.pos = end
+
+    def _skip_value(self) -> None:
+        char = self._ws()
+        if char == '"':
+            self._skip_string()
+        elif char in ('[', '{'):
+            self._skip_container()
+        else:
+            self._skip_scalar()
+
+    def _raw_value(self) -> str:
+        self._ws()
+        self.mark = self.pos
+        try:
+            self._skip_value()
+            return self.buf[self.mark : self.pos]
+        finally:
+            self.mark = None
+
+    def _read_value(self) -> Any:
+        return json.loads(self._raw_value())
+
+    def _read_key(self) -> str:
+        if self._ws() != '"':
+            raise self._error('Expected a key')
+        raw = self._raw_value()
+        return json.loads(raw) if '\\' in raw else raw[1:-1]
+
+    # Matching
+
+    def _value(self, matchers: list[Matcher]) -> None:
+        if not matchers:
+            self._skip_value()
+            return
+        char = self._ws()
+        if char not in ('[', '{') or any(i == len(steps) for _, steps, i in matchers):
+            value = self._read_value()
+            for slot, steps, i in matchers:
+                slot.set_from(PathPlan(steps[i:]), value)
+        elif char == '{':
+            self._object(matchers)
+        else:
+            self._array(matchers)
+
+    def _object(self, matchers: list[Matcher]) -> None:
+        self.pos += 1
+        for slot, steps, i in matchers:
+            if type(steps[i]) is Each:
+                slot.items = []
+        if self._ws() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self._read_key()
+            self._expect(':')
+            children = []
+            for slot, steps, i in matchers:
+                step = steps[i]
+                if type(step) is Each:
+                    item = Slot()
+                    slot.items.append(item)
+                    children.append((item, steps, i + 1))
+                elif type(step) in (Auto, Key) and step._v == key:
+                    children.append((slot, steps, i + 1))
+            self._value(children)
+            if self._expect(',}') == '}':
+                return
+
+    def _array(self, matchers: list[Matcher]) -> None:
+        self.pos += 1
+        # Items are matched by positions: (slot, steps, i, start, stop, step, fans)
+        immediate, deferred = [], []
+        for slot, steps, i in matchers:
+            step = steps[i]
+            if type(step) in (Auto, Index):
+                try:
+                    index = int(step._v)
+                except (ValueError, TypeError):
+                    continue
+                if index < 0:
+                    deferred.append((slot, steps, i, deque(maxlen=-index)))
+                else:
+                    immediate.append((slot, steps, i, index, index + 1, 1, False))
+            elif type(step) is Each:
+                slot.items = []
+                immediate.append((slot, steps, i, 0, None, 1, True))
+            elif type(step) is Slice:
+                bounds = step._v
+                if any(
+                    bound is not None and bound < 0
+                    for bound in (bounds.start, bounds.stop, bounds.step)
+                ):
+                    deferred.append((slot, steps, i, []))
+                    continue
+                if bounds.step == 0:  # invalid slice, nothing matches
+                    continue
+                slot.items = []
+                immediate.append((
+                    slot, steps, i, bounds.start or 0, bounds.stop, bounds.step or 1, True
+                ))
+
+        position = 0
+        while True:
+            if self._ws() == ']':
+                self.pos += 1
+                break
+            if not deferred and all(
+                stop is not None and stop <= position for *_, stop, _, _ in immediate
+            ):
+                self._skip_container(depth=1)
+                break
+            children = []
+            for slot, steps, i, start, stop, step, fans in immediate:
+                if (
+                    position < start
+                    or (stop is not None and position >= stop)
+                    or (position - start) % step
+                ):
+                    continue
+                if not fans:
+                    children.append((slot, steps, i + 1))
+                else:
+                    item = Slot()
+                    slot.items.append(item)
+                    children.append((item, steps, i + 1))
+            if deferred:
+                raw = self._raw_value()
+                for *_, kept in deferred:
+                    kept.append(raw)
+                if children:
+                    value = json.loads(raw)
+                    for slot, steps, i in children:
+                        slot.set_from(PathPlan(steps[i:]), value)
+            else:
+                self._value(children)
+            position += 1
+            if self._expect(',]') == ']':
+                break
+
+        for slot, steps, i, kept in deferred:
+            items = [json.loads(raw) for raw in kept]
+            if type(steps[i]) is Slice:
+                slot.set_from(PathPlan(steps[i:]), items)
+            elif len(items) == kept.maxlen:
+                slot.set_from(PathPlan(steps[i + 1 :]), items[0])
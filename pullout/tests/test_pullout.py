@@ -0,0 +1,525 @@
+import io
+import json
+import mmap
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr
+from types import SimpleNamespace
+from unittest import TestCase, skipIf
+
+from ..cli import extract, main, parse_path_spec
+from ..columns import np
+from ..core import PullOut
+from ..plan import MISSING, PathMissError, PathPlan, compile_path
+from ..projection import Projection
+from ..stream import JSONStream
+from ..types import Attr, Auto, Each, Index, Key, Slice
+
+
+class TestPullOut(TestCase):
+    def setUp(self) -> None:
+        self.structure = {
+            'name': 'Some name',
+            'objects': [
+                SimpleNamespace(status_code=200),
+                {'another_dict': 11, 'none': None},
+                ('zero', 'one'),
+            ],
+        }
+
+    def test_positional_args(self):
+        self.assertEqual(PullOut('objects', 1, 'another_dict').From(self.structure), 11)
+        self.assertEqual(PullOut('objects', 0, 'status_code').From(self.structure), 200)
+
+    def test_dotted_path(self):
+        self.assertEqual(PullOut('objects.1.another_dict').From(self.structure), 11)
+        self.assertEqual(PullOut('objects[2][1]').From(self.structure), 'one')
+        self.assertEqual(PullOut('.objects[2].0').From(self.structure), 'zero')
+
+    def test_type_markers(self):
+        self.assertEqual(
+            PullOut(Key('objects'), Index(-1), Index(0)).From(self.structure), 'zero'
+        )
+        self.assertEqual(
+            PullOut('objects', 0, Attr('status_code')).From(self.structure), 200
+        )
+        self.assertIsNone(PullOut(Attr('objects')).From(self.structure))
+
+    def test_no_per_call_state(self):
+        extractor = PullOut('objects.1.another_dict')
+        extractor.From(self.structure)
+        self.assertFalse(hasattr(extractor, 'obj'))
+        with self.assertRaises(AttributeError):
+            extractor.obj = self.structure
+
+    def test_missing_path_returns_none(self):
+        self.assertIsNone(PullOut('objects.1.missing.deeper').From(self.structure))
+        self.assertIsNone(PullOut('objects.1.none.deeper').From(self.structure))
+        self.assertIsNone(PullOut('objects.key').From(self.structure))
+        self.assertIsNone(PullOut('name.0').From(self.structure))
+
+
+class TestMissPolicies(TestCase):
+    def setUp(self) -> None:
+        self.document = {'a': {'none': None, 'list': [1, 2]}}
+
+    def test_index_out_of_range_is_a_miss(self):
+        self.assertIsNone(PullOut('a.list.2').From(self.document))
+        self.assertIsNone(PullOut('a.list', Index(-3)).From(self.document))
+        self.assertEqual(PullOut('a.list', Index(-2)).From(self.document), 1)
+
+    def test_default(self):
+        self.assertEqual(PullOut('a.missing', default=0).From(self.document), 0)
+        self.assertEqual(PullOut('a.list.x', default=0).From(self.document), 0)
+        self.assertEqual(PullOut('a.none.x', default=0).From(self.document), 0)
+        self.assertIsNone(PullOut('a.none', default=0).From(self.document))
+
+    def test_failing_property_is_a_miss(self):
+        class Broken:
+            @property
+            def value(self):
+                raise ValueError('broken')
+
+        for path in ('value', Attr('value')):
+            with self.subTest(path=path):
+                self.assertEqual(PullOut(path, default=0).From(Broken()), 0)
+                self.assertEqual(list(PullOut('[*]', path).From([Broken()])), [None])
+
+    def test_sentinel(self):
+        self.assertIs(PullOut('a.missing', on_miss='sentinel').From(self.document), MISSING)
+        self.assertIsNone(PullOut('a.none', on_miss='sentinel').From(self.document))
+        self.assertFalse(MISSING)
+
+    def test_raise(self):
+        extractor = PullOut('a.missing', on_miss='raise')
+        with self.assertRaises(PathMissError):
+            extractor.From(self.document)
+        with self.assertRaises(PathMissError):
+            extractor.ListFrom([self.document])
+        with self.assertRaises(LookupError):
+            extractor.FromStream(json.dumps(self.document))
+        self.assertIsNone(PullOut('a.none', on_miss='raise').From(self.document))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            PullOut('a', on_miss='ignore')
+
+    def test_batches_and_streams(self):
+        extractor = PullOut('a.list.1', default=-1)
+        self.assertEqual(extractor.ListFrom([self.document, {}]), [2, -1])
+        self.assertEqual(list(extractor.FromMany([{}])), [-1])
+        self.assertEqual(extractor.FromStream('{"a": {"list": [1]}}'), -1)
+        self.assertEqual(
+            PullOut('a.none', on_miss='sentinel').FromStream('{"a": {"none": null}}'),
+            None,
+        )
+        self.assertIs(
+            PullOut('a.b', on_miss='sentinel').FromStream('{"a": {"none": null}}'),
+            MISSING,
+        )
+
+    def test_fan_out_items(self):
+        extractor = PullOut('[*].price', default=0)
+        self.assertEqual(list(extractor.From([{'price': 1}, {}])), [1, 0])
+        self.assertEqual(extractor.FromStream('[{"price": 1}, {}]'), [1, 0])
+
+    def test_projection(self):
+        paths = {'none': 'a.none', 'one': 'a.list.0', 'x': 'a.x', 'y': 'b.y'}
+        self.assertEqual(
+            Projection(paths, default=0).From(self.document),
+            {'none': None, 'one': 1, 'x': 0, 'y': 0},
+        )
+        self.assertEqual(
+            Projection(paths, on_miss='sentinel').FromStream(json.dumps(self.document)),
+            {'none': None, 'one': 1, 'x': MISSING, 'y': MISSING},
+        )
+        with self.assertRaisesRegex(PathMissError, "'x', 'y'"):
+            Projection(paths, on_miss='raise').From(self.document)
+
+
+class TestPathPlan(TestCase):
+    def test_plan_is_cached_per_spec(self):
+        self.assertIs(compile_path('a.b[0].c'), compile_path('a.b[0].c'))
+        self.assertIs(compile_path('a', Index(0)), compile_path('a', Index(0)))
+        self.assertIs(PullOut('a.b').plan, PullOut('a.b').plan)
+
+    def test_unhashable_spec_is_compiled(self):
+        plan = compile_path(Key(['unhashable']))
+        self.assertEqual(plan.args, (Key(['unhashable']),))
+        self.assertIsNone(plan({'a': 1}))
+
+    def test_plan_steps(self):
+        plan = compile_path('a[0]', Attr('real'))
+        self.assertEqual(plan.args, ('a', '0', Attr('real')))
+        self.assertEqual(plan.steps, (Auto('a'), Auto('0'), Attr('real')))
+        self.assertEqual(plan({'a': [5]}), 5)
+
+    def test_plan_is_immutable(self):
+        plan = PathPlan(['a'])
+        with self.assertRaises(AttributeError):
+            plan.steps = ()
+
+
+class TestFanOut(TestCase):
+    def setUp(self) -> None:
+        self.order = {
+            'items': [
+                {'price': 10, 'tags': ['a', 'b']},
+                {'price': 20},
+                {'price': 30, 'tags': ['c']},
+            ],
+            'totals': {'net': 50, 'gross': 60},
+        }
+
+    def test_grammar(self):
+        self.assertEqual(
+            compile_path('items[*].price', 'a[2:10]', 'b[::-1]', 'c.*').args,
+            (
+                'items', Each(), 'price',
+                'a', Slice(slice(2, 10)),
+                'b', Slice(slice(None, None, -1)),
+                'c', Each(),
+            ),
+        )
+        self.assertIs(compile_path('items[1:]'), compile_path('items[1:]'))
+
+    def test_wildcard(self):
+        prices = PullOut('items[*].price').From(self.order)
+        self.assertNotIsInstance(prices, list)
+        self.assertEqual(list(prices), [10, 20, 30])
+        self.assertEqual(list(PullOut('totals.*').From(self.order)), [50, 60])
+
+    def test_slice(self):
+        self.assertEqual(list(PullOut('items[1:].price').From(self.order)), [20, 30])
+        self.assertEqual(list(PullOut('items[::-2].price').From(self.order)), [30, 10])
+
+    def test_nested_fan_outs_are_flattened(self):
+        self.assertEqual(
+            list(PullOut('items[*].tags[*]').From(self.order)), ['a', 'b', None, 'c']
+        )
+
+    def test_fan_out_miss(self):
+        self.assertIsNone(PullOut('missing[*].price').From(self.order))
+        self.assertIsNone(PullOut('totals.net[*]').From(self.order))
+        self.assertIsNone(PullOut('totals[1:]').From(self.order))
+
+    def test_fan_out_is_lazy(self):
+        items = [{'price': 1}]
+        prices = PullOut('[*].price').From(items)
+        sliced = PullOut('[1:].price').From(items)
+        items.append({'price': 2})  # nothing was materialized before
+        self.assertEqual(list(prices), [1, 2])
+        self.assertEqual(list(sliced), [2])
+
+    def test_projection_with_fan_out(self):
+        project = Projection({'prices': 'items[*].price', 'net': 'totals.net'})
+        result = project.From(self.order)
+        self.assertEqual(result['net'], 50)
+        self.assertEqual(list(result['prices']), [10, 20, 30])
+
+
+class TestBatchExtraction(TestCase):
+    def setUp(self) -> None:
+        self.records = [{'a': {'price': 1.5}}, {'a': {}}, {'a': {'price': 3}}]
+
+    def test_from_many_is_lazy(self):
+        results = PullOut('a.price').FromMany(iter(self.records))
+        self.assertEqual(next(results), 1.5)
+        self.assertEqual(list(results), [None, 3])
+
+    def test_list_from(self):
+        self.assertEqual(PullOut('a.price').ListFrom(self.records), [1.5, None, 3])
+        self.assertEqual(PullOut('a.price').ListFrom(iter(self.records)), [1.5, None, 3])
+
+    def test_array_from(self):
+        extractor = PullOut('a.price')
+        self.assertEqual(extractor.ArrayFrom(self.records).tolist(), [1.5, 0.0, 3.0])
+        self.assertEqual(
+            extractor.ArrayFrom(iter(self.records[1:]), 'q', missing=-1).tolist(),
+            [-1, 3],
+        )
+
+    def test_array_from_miss_policies(self):
+        records = [*self.records, {'a': {'price': None}}]
+        self.assertEqual(
+            PullOut('a.price', default=-2).ArrayFrom(records, missing=-1).tolist(),
+            [1.5, -2.0, 3.0, -1.0],
+        )
+        self.assertEqual(
+            PullOut('a.price', default=-2).ArrayFrom(iter(records)).tolist(),
+            [1.5, -2.0, 3.0, 0.0],
+        )
+        extractor = PullOut('a.price', on_miss='sentinel')
+        self.assertEqual(extractor.ArrayFrom(records).tolist(), [1.5, 0.0, 3.0, 0.0])
+        with self.assertRaises(PathMissError):
+            PullOut('a.price', on_miss='raise').ArrayFrom(records)
+
+
+class TestProjection(TestCase):
+    def setUp(self) -> None:
+        self.document = {
+            'data': {
+                'user': {
+                    'profile': {'name': 'John', 'tags': ['a', 'b']},
+                    'id': 7,
+                },
+            },
+        }
+
+    def test_projection(self):
+        project = Projection({
+            'name': 'data.user.profile.name',
+            'tag': ('data.user.profile.tags', Index(-1)),
+            'id': 'data.user.id',
+            'missing': 'data.user.profile.missing.deeper',
+            'whole': compile_path(),
+        })
+        self.assertEqual(
+            project.From(self.document),
+            {
+                'name': 'John',
+                'tag': 'b',
+                'id': 7,
+                'missing': None,
+                'whole': self.document,
+            },
+        )
+
+    def test_shared_prefix_is_walked_once(self):
+        project = Projection({'name': 'data.user.profile.name', 'id': 'data.user.id'})
+        names, _, children = project.trie
+        self.assertEqual(names, ())
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0][0], Auto('data'))
+
+    def test_same_results_as_pull_out(self):
+        paths = {'a': 'data.user.id', 'b': 'data.user.profile.tags[0]', 'c': 'data.x'}
+        project = Projection(paths)
+        self.assertEqual(
+            project.From(self.document),
+            {name: PullOut(path).From(self.document) for name, path in paths.items()},
+        )
+
+    def test_record(self):
+        project = Projection({'id': 'data.user.id', 'name': 'x.y'}, record='User')
+        user = project.From(self.document)
+        self.assertEqual((user.id, user.name), (7, None))
+        self.assertEqual(type(user).__name__, 'User')
+        self.assertFalse(hasattr(user, '__dict__'))
+
+    def test_many(self):
+        project = Projection({'id': 'data.user.id'})
+        self.assertEqual(
+            project.ListFrom([self.document, {}]), [{'id': 7}, {'id': None}]
+        )
+        self.assertEqual(next(project.FromMany([self.document])), {'id': 7})
+
+
+class TestConcurrency(TestCase):
+    def setUp(self) -> None:
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # force threads to interleave
+
+    def tearDown(self) -> None:
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_shared_extractor_has_no_cross_talk(self):
+        extractor = PullOut('data.items[0].id')
+        project = Projection({'id': 'data.items[0].id', 'n': 'data.n'})
+
+        def work(n):
+            payloads = [{'data': {'items': [{'id': (n, i)}], 'n': n}} for i in range(200)]
+            return all(
+                extractor.From(payload) == (n, i)
+                and project.From(payload) == {'id': (n, i), 'n': n}
+                for i, payload in enumerate(payloads)
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertTrue(all(executor.map(work, range(64))))
+
+
+class TestColumns(TestCase):
+    def setUp(self) -> None:
+        self.records = [
+            {'id': 1, 'price': 10, 'paid': True, 'name': 'a', 'big': 1},
+            {'id': 2, 'price': 2.5, 'paid': False, 'big': 2**70},
+            {'id': 3, 'paid': None, 'name': 'c'},
+        ]
+        self.project = Projection({
+            'id': 'id', 'price': 'price', 'paid': 'paid', 'name': 'name', 'big': 'big',
+        })
+
+    def test_columns(self):
+        columns = self.project.ColumnsFrom(self.records, use_numpy=False)
+        self.assertEqual(
+            {name: column.kind for name, column in columns.items()},
+            {'id': 'int', 'price': 'float', 'paid': 'bool', 'name': 'object', 'big': 'object'},
+        )
+        self.assertEqual(columns['id'].values.typecode, 'q')
+        self.assertEqual(columns['id'].values.tolist(), [1, 2, 3])
+        self.assertEqual(columns['price'].values.tolist(), [10.0, 2.5, 0.0])
+        self.assertEqual(columns['price'].valid, bytearray([1, 1, 0]))
+        self.assertEqual(columns['paid'].values.tolist(), [1, 0, 0])
+        self.assertEqual(columns['paid'].valid, bytearray([1, 1, 0]))
+        self.assertEqual(columns['name'].values, ['a', None, 'c'])
+        self.assertEqual(columns['big'].values, [1, 2**70, None])
+        self.assertEqual(len(columns['id']), 3)
+
+    def test_bool_column_promoted_to_objects(self):
+        project = Projection({'flag': 'flag'})
+        column = project.ColumnsFrom([{'flag': True}, {}, {'flag': 'yes'}], False)['flag']
+        self.assertEqual(column.values, [True, None, 'yes'])
+
+    @skipIf(np is None, 'NumPy is not installed')
+    def test_numpy_columns(self):
+        columns = self.project.ColumnsFrom(self.records, use_numpy=True)
+        self.assertEqual(columns['id'].values.dtype, np.int64)
+        self.assertEqual(columns['paid'].values.tolist(), [True, False, False])
+        self.assertEqual(columns['price'].valid.tolist(), [True, True, False])
+        self.assertEqual(columns['name'].values, ['a', None, 'c'])
+
+    @skipIf(np is not None, 'NumPy is installed')
+    def test_numpy_required(self):
+        with self.assertRaises(ImportError):
+            self.project.ColumnsFrom(self.records, use_numpy=True)
+
+
+class TestStream(TestCase):
+    def setUp(self) -> None:
+        self.document = {
+            'meta': {'count': 3, 'note': 'escaped \\ "quotes" and ünicode'},
+            'items': [
+                {'id': 1, 'price': 10.5, 'tags': ['a', 'b']},
+                {'id': 2, 'skip': {'deep': [[1, 2], {'x': ']}'}]}},
+                {'id': 3, 'price': None, 'tags': []},
+            ],
+        }
+        self.text = json.dumps(self.document, indent=2, ensure_ascii=False)
+        self.paths = [
+            'meta.count',
+            'meta.note',
+            'items[1].id',
+            'items[-1].id',
+            'items[*].price',
+            'items[*].tags[*]',
+            'items[::-1].id',
+            'items[1].skip',
+            'items.0.tags.x',
+            'items.0.tags.5',
+            'missing.path',
+            'meta.note[0]',
+        ]
+
+    def expected(self, path):
+        plan = compile_path(path)
+        value = plan(self.document)
+        return list(value) if plan.fans_out and value is not None else value
+
+    def test_same_results_as_from(self):
+        for chunk_size in (1, 3, 64):
+            for path in self.paths:
+                with self.subTest(path=path, chunk_size=chunk_size):
+                    self.assertEqual(
+                        PullOut(path).FromStream(self.text.encode(), chunk_size),
+                        self.expected(path),
+                    )
+
+    def test_sources(self):
+        extractor = PullOut('items[0].tags[1]')
+        self.assertEqual(extractor.FromStream(self.text), 'b')
+        self.assertEqual(extractor.FromStream(io.StringIO(self.text)), 'b')
+        self.assertEqual(extractor.FromStream(io.BytesIO(self.text.encode())), 'b')
+        with tempfile.TemporaryFile() as file:
+            file.write(self.text.encode())
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(extractor.FromStream(mapped), 'b')
+
+    def test_projection(self):
+        project = Projection({path: path for path in self.paths})
+        self.assertEqual(
+            project.FromStream(io.BytesIO(self.text.encode()), chunk_size=5),
+            {path: self.expected(path) for path in self.paths},
+        )
+
+    def test_unreachable_subtrees_are_not_decoded(self):
+        text = '{"a": {"b": 1}, "broken": {"x": [1, 2,, oops]}, "c": [tru]}'
+        self.assertEqual(PullOut('a.b').FromStream(text), 1)
+        with self.assertRaises(ValueError):
+            PullOut('broken.x').FromStream(text)
+
+    def test_buffer_is_bounded(self):
+        stream = JSONStream(
+            json.dumps({'big': ['x' * 100] * 1000, 'small': 1}), chunk_size=256
+        )
+        self.assertEqual(stream.extract((compile_path('small'),)), [1])
+        self.assertLess(len(stream.buf), 512)
+
+    def test_malformed(self):
+        for text in ('{"a": ', '{"a" 1}', '[1, 2', '"unterminated'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                PullOut('a').FromStream(text)
+
+
+class TestCli(TestCase):
+    def setUp(self) -> None:
+        self.lines = (
+            b'{"id": 1, "order": {"price": 2.5, "note": "tab\\there"}}\n'
+            b'\n'
+            b'broken line\n'
+            b'{"id": 2, "order": {"tags": ["a", "b"]}}\n'
+        )
+        self.specs = tuple(
+            parse_path_spec(spec)
+            for spec in ('id', 'price=order.price', 'order.note', 'tags=order.tags[*]')
+        )
+
+    def extract(self, **kwargs):
+        output = io.StringIO()
+        counts = extract([io.BytesIO(self.lines)], output, self.specs, **kwargs)
+        return output.getvalue(), counts
+
+    def test_path_specs(self):
+        self.assertEqual(
+            self.specs,
+            (('id', 'id'), ('price', 'order.price'), ('order.note', 'order.note'),
+             ('tags', 'order.tags[*]')),
+        )
+
+    def main_error(self, argv):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit) as cm:
+            main(argv)
+        self.assertEqual(cm.exception.code, 2)
+        return stderr.getvalue()
+
+    def test_duplicate_names(self):
+        stderr = self.main_error(['-p', 'id', '-p', 'id=order.id', '-q'])
+        self.assertIn('error: duplicate path names: id', stderr)
+
+    def test_missing_input(self):
+        with tempfile.NamedTemporaryFile() as existing:
+            missing = existing.name + '.missing'
+            stderr = self.main_error(['-p', 'id', '-q', existing.name, missing])
+            self.assertIn(f"error: can't open '{missing}'", stderr)
+
+    def test_tsv(self):
+        output, counts = self.extract(header=True, chunk_size=1)
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(
+            output.splitlines(),
+            ['id\tprice\torder.note\ttags', '1\t2.5\ttab\\there\t', '2\t\t\t["a", "b"]'],
+        )
+
+    def test_ndjson_in_processes(self):
+        output, counts = self.extract(output_format='ndjson', jobs=2, chunk_size=1)
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(
+            [json.loads(line) for line in output.splitlines()],
+            [
+                {'id': 1, 'price': 2.5, 'order.note': 'tab\there', 'tags': None},
+                {'id': 2, 'price': None, 'order.note': None, 'tags': ['a', 'b']},
+            ],
+        )
@@ -1,9 +1,66 @@
-from collections.abc import Mapping, MutableSequence, Sequence
+from collections.abc import Iterator, Mapping, MutableSequence, Sequence
+from itertools import islice
 from typing import Any
 
 
 NonStrSequence = MutableSequence | tuple
 
+# Ways of extraction
+KEY, INDEX, ATTR = 'key', 'index', 'attr'
+
+# Per-type dispatch cache, prefilled with exact types seen most of the time.
+# Unknown types are checked against ABCs once and then cached as well.
+DISPATCH_CACHE_SIZE = 1024
+TYPE_KINDS: dict[type, str] = {dict: KEY, list: INDEX, tuple: INDEX, str: ATTR}
+
+
+def kind_of(target_type: type) -> str:
+    """
+    Returns the way of extraction for the type: `KEY` for mappings, `INDEX`
+    for sequences (except strings) and `ATTR` for anything else.
+
+    >>> kind_of(dict), kind_of(tuple), kind_of(str)
+    ('key', 'index', 'attr')
+    """
+    kind = TYPE_KINDS.get(target_type)
+    if kind is not None:
+        return kind
+    if issubclass(target_type, Mapping):
+        kind = KEY
+    elif issubclass(target_type, NonStrSequence):
+        kind = INDEX
+    else:
+        kind = ATTR
+    if len(TYPE_KINDS) < DISPATCH_CACHE_SIZE:
+        TYPE_KINDS[target_type] = kind
+    return kind
+
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _get_attr(target: Any, name: str, missing: Any) -> Any:
+    """
+    `getattr` with a default. `ValueError`, `TypeError` and `KeyError`
+    raised by a property are a miss too, as they always were in `PullOut`.
+    """
+    try:
+        return getattr(target, name, missing)
+    except (ValueError, TypeError, KeyError):
+        return missing
+
+
+def _as_index(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
 
 class TypeContainer:
     """Base class for type-marked arguments"""
@@ -12,8 +69,18 @@ class TypeContainer:
         self._v = _v
 
     def __call__(self, target):
+        return self.get(target)
+
+    def get(self, target, missing=None):
+        """Returns the extracted value, or `missing` if there is no such value"""
         return self._v
 
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other._v == self._v
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._v))
+
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}({self._v!r})'
 
@@ -36,8 +103,12 @@ class Attr(TypeContainer):
     'Darwin'
     """
 
-    def __call__(self, target) -> Any | None:
-        return getattr(target, self._v, None)
+    def __init__(self, _v):
+        super().__init__(_v)
+        self._is_name = isinstance(_v, str)
+
+    def get(self, target, missing=None) -> Any:
+        return _get_attr(target, self._v, missing) if self._is_name else missing
 
 
 class Key(TypeContainer):
@@ -59,8 +130,14 @@ class Key(TypeContainer):
     True
     """
 
-    def __call__(self, target) -> Any | None:
-        return target.get(self._v) if isinstance(target, Mapping) else None
+    def __init__(self, _v):
+        super().__init__(_v)
+        self._is_hashable = _is_hashable(_v)
+
+    def get(self, target, missing=None) -> Any:
+        if self._is_hashable and kind_of(type(target)) is KEY:
+            return target.get(self._v, missing)
+        return missing
 
 
 class Index(TypeContainer):
@@ -82,5 +159,107 @@ class Index(TypeContainer):
     'three'
     """
 
-    def __call__(self, target) -> Any | None:
-        return target[int(self._v)] if isinstance(target, NonStrSequence) else None
+    def __init__(self, _v):
+        super().__init__(_v)
+        self._index = _as_index(_v)
+
+    def get(self, target, missing=None) -> Any:
+        index = self._index
+        if index is None or kind_of(type(target)) is not INDEX:
+            return missing
+        return target[index] if -len(target) <= index < len(target) else missing
+
+
+class Auto(TypeContainer):
+    """
+    Extract value in the way detected by the target type: as a key from
+    mappings, as an index from sequences and as an attribute otherwise
+
+    >>> Auto('one')({'one': 1})
+    1
+    >>> Auto('0')(['zero', 'one'])
+    'zero'
+    >>> Auto('real')(12)
+    12
+    """
+
+    def __init__(self, _v):
+        super().__init__(_v)
+        self._is_hashable = _is_hashable(_v)
+        self._is_name = isinstance(_v, str)
+        self._index = _as_index(_v)
+
+    def get(self, target, missing=None) -> Any:
+        kind = TYPE_KINDS.get(type(target)) or kind_of(type(target))
+        if kind is KEY:
+            return target.get(self._v, missing) if self._is_hashable else missing
+        if kind is INDEX:
+            index = self._index
+            if index is None or not -len(target) <= index < len(target):
+                return missing
+            return target[index]
+        return _get_attr(target, self._v, missing) if self._is_name else missing
+
+
+class FanOut(TypeContainer):
+    """
+    Base class for steps which lead to many values at once.
+
+    Called on a target, fan-out steps return a lazy iterator over the
+    selected items, or `missing` if the target can't be fanned out.
+    """
+
+
+class Each(FanOut):
+    """
+    Iterate over all items of a sequence or all values of a mapping
+    (the `*` step of a path)
+
+    >>> list(Each()([1, 2, 3]))
+    [1, 2, 3]
+    >>> list(Each()({'one': 1, 'two': 2}))
+    [1, 2]
+    """
+
+    def __init__(self, _v='*'):
+        super().__init__(_v)
+
+    def get(self, target, missing=None) -> Iterator[Any] | Any:
+        kind = kind_of(type(target))
+        if kind is KEY:
+            return iter(target.values())
+        if kind is INDEX:
+            return iter(target)
+        return missing
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}()'
+
+
+class Slice(FanOut):
+    """
+    Iterate over a slice of a sequence (the `[start:stop:step]` step of a path)
+
+    >>> list(Slice(slice(1, 3))(['zero', 'one', 'two', 'three']))
+    ['one', 'two']
+    >>> list(Slice(slice(None, None, -2))([0, 1, 2, 3, 4, 5]))
+    [5, 3, 1]
+
+    Slices with non-negative bounds are iterated lazily, without copying
+    the sliced part of the sequence.
+    """
+
+    def get(self, target, missing=None) -> Iterator[Any] | Any:
+        _v = self._v
+        if _v.step == 0 or kind_of(type(target)) is not INDEX:
+            return missing
+        if (
+            (_v.start is None or _v.start >= 0)
+            and (_v.stop is None or _v.stop >= 0)
+            and (_v.step is None or _v.step > 0)
+        ):
+            return islice(target, _v.start, _v.stop, _v.step)
+        return iter(target[_v])
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._v.start, self._v.stop, self._v.step))
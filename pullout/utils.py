@@ -1,9 +1,14 @@
+import re
 from collections.abc import MutableSequence, Sequence
 from typing import Any
 
+from .types import Each, Slice
+
 
 NonStrSequence = MutableSequence | tuple
 
+SLICE_RE = re.compile(r'^(-?\d*):(-?\d*)(?::(-?\d*))?$')
+
 
 class ArgsProcessor:
     def __init__(self, *args):
@@ -23,11 +28,25 @@ class ArgsProcessor:
     def process_dots(self, arg) -> str | NonStrSequence:
         return arg.split('.') if '.' in arg else arg
 
-    def string_arg_processing(self, arg) -> str | NonStrSequence:
+    def process_fan_out_token(self, token) -> Any:
+        if token == '*':
+            return Each()
+        if match := SLICE_RE.match(token):
+            bounds = (int(bound) if bound else None for bound in match.groups())
+            return Slice(slice(*bounds))
+        return token
+
+    def process_fan_outs(self, arg) -> Any:
+        if isinstance(arg, NonStrSequence):
+            return [self.process_fan_out_token(token) for token in arg]
+        return self.process_fan_out_token(arg)
+
+    def string_arg_processing(self, arg) -> Any:
         steps = (
             self.process_square_brackets,
             self.process_prefix_dot,
             self.process_dots,
+            self.process_fan_outs,
         )
         result = arg
         for step in steps:
@@ -1,6 +1,83 @@
+import asyncio
+import base64
+import copy
+import datetime
+import json
 import math
-from collections.abc import Sequence
-from typing import Self
+import os
+import time
+from array import array
+from collections import deque
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from decimal import Decimal
+from itertools import count, islice
+from typing import Any, Literal, NamedTuple, Self
+from uuid import UUID
+
+
+try:
+    from django.db.models import Q, QuerySet
+except ImportError:  # Django is optional, needed for KeysetPager with querysets
+    Q = QuerySet = None
+
+
+# Pager.map(chunk_size="auto"): how long to measure the per-item cost
+# and how long a chunk should take to outweigh the dispatch overhead
+MAP_PROBE_SECONDS = 0.01
+MAP_CHUNK_SECONDS = 0.05
+
+# Key values which are not JSON types are stored in cursors as
+# {tag: str(value)} and restored with the parser; datetime goes before date
+CURSOR_TYPES: dict[str, tuple[type, Callable[[str], Any]]] = {
+    "datetime": (datetime.datetime, datetime.datetime.fromisoformat),
+    "date": (datetime.date, datetime.date.fromisoformat),
+    "time": (datetime.time, datetime.time.fromisoformat),
+    "decimal": (Decimal, Decimal),
+    "uuid": (UUID, UUID),
+}
+
+
+def _is_queryset(source: Any) -> bool:
+    """Duck typing for ORM querysets (Django), which are not `Sequence`."""
+    return hasattr(source, "filter") and hasattr(source, "order_by")
+
+
+def _map_chunk(func: Callable[[Any], Any], items: Iterable) -> list:
+    # Module level function: process pools pickle it by name
+    return [func(item) for item in items]
+
+
+class PageView(NamedTuple):
+    """
+    Immutable bounds of one page, given by `Pager.at()`. Supports @-sign
+    slicing of sequences and querysets like the pager itself, but does not
+    check the sequence length and does not trim count-free pages: the slice
+    has `limit` items, pass it to `Pager.paginate()` when it matters.
+    """
+
+    page: int
+    offset: int
+    limit: int
+    start: int
+    end: int
+
+    @property
+    def slicer(self) -> slice:
+        return slice(self.start, self.end)
+
+    def __rmatmul__(self, sequence: Sequence) -> Sequence:
+        if not (_is_queryset(sequence) or isinstance(sequence, Sequence)):
+            raise TypeError(f"{sequence.__class__!r} not a sequence")
+        return sequence[self.start : self.end]
 
 
 class Pager:
@@ -50,8 +127,9 @@ class Pager:
 
     ## Declare Pager
 
-    - `total_items: int` - total number of items
+    - `total_items: int | None` - total number of items, `None` if unknown
     - `page_size: int` - number of items per page, default is 10
+    - `approximate: bool` - `total_items` is an estimate, default is False
 
     ```
     >>> pager = Pager(total_items=8, page_size=3)
@@ -155,32 +233,209 @@ class Pager:
 
     It is assumed that basically this feature should be used when generating
     JSON structures in HTTP API responses.
+
+    ## Pagination without COUNT(*)
+
+    Exact `total_items` usually costs a `COUNT(*)` query, which may be
+    heavier than the page query itself. Pass `None` instead: `limit` (and
+    `end`) then cover `page_size + 1` items, and the extra item tells whether
+    there is a next page. Applying the pager with @-sign (to sequences and
+    querysets) returns a list trimmed to `page_size` items; for raw SQL pass the
+    fetched rows to `paginate()`. `has_next_page` is known only after that,
+    `pages_count` is `None` and `len()` raises `TypeError`.
+
+    ```
+    >>> pager = Pager(page_size=3)
+    >>> pager[2]
+    Pager(page=2, pages_count=None, total_items=None, offset=3, limit=4, start=3, end=7)
+    >>> range(20) @ pager, pager.has_next_page
+    ([3, 4, 5], True)
+    >>> [list(range(8)) @ page for page in pager]
+    [[0, 1, 2], [3, 4, 5], [6, 7]]
+    ```
+
+    Iteration goes on while the applied page says there is a next one.
+
+    ## Estimated total
+
+    With `approximate=True`, `total_items` is taken from a cheap estimate,
+    e.g. `pg_count()` from `django/fast_count.py`. Pages are fetched the same
+    way as without count, and the estimate is used only for `pages_count`
+    (never less than the reached page). `state()` of both modes has
+    `approximate` and `has_next_page` keys.
+
+    ```
+    >>> pager = Pager(pg_count(MyUser)[0], page_size=20, approximate=True)
+    >>> pager.state("pages_count", "approximate")
+    {'pages_count': 4210, 'approximate': True}
+    ```
+
+    ## Prefetching pages
+
+    `prefetch(fetch, ahead)` iterates over pages like `for page in pager`,
+    but calls `fetch(page)` in a thread pool keeping `ahead` pages in flight,
+    so the database latency of the next pages overlaps with processing of the
+    current one. Results are yielded in page order, and no more than `ahead`
+    of them are held at once. Each call gets its own copy of the pager,
+    the pager itself is not changed.
+
+    ```
+    >>> for users in pager.prefetch(lambda page: list(queryset @ page), ahead=4):
+    >>>     export(users)
+    ```
+
+    `aprefetch()` does the same for async fetchers with asyncio tasks:
+
+    ```
+    >>> async for users in pager.aprefetch(lambda page: fetch_users(page.offset)):
+    >>>     await export(users)
+    ```
+
+    With exact count `fetch` gets `PageView`s (see below). Without it
+    `fetch` gets copies of the pager, and the iteration stops on the first
+    page whose copy has no next page after `fetch`, so the fetcher should
+    apply the page with @-sign or call `paginate()`. Pages fetched after
+    the last one are cancelled or dropped.
+
+    ## Immutable page views
+
+    `pager[n]` and iteration change the pager itself, so a shared pager is
+    not safe across threads. `at(n)` returns a `PageView` instead: a named
+    tuple of `page`, `offset`, `limit`, `start` and `end`, which leaves
+    the pager untouched. Page numbers are clamped the same way.
+
+    ```
+    >>> pager = Pager(total_items=8, page_size=3)
+    >>> pager.at(3)
+    PageView(page=3, offset=6, limit=3, start=6, end=8)
+    >>> [range(10) @ pager.at(n) for n in range(1, len(pager) + 1)]
+    [range(0, 3), range(3, 6), range(6, 8)]
+    ```
+
+    `bounds(first, last)` gives the bounds of a range of pages at once,
+    as `array('q')` columns, e.g. for sitemaps or batch jobs. `last` is
+    the last page by default (required without `total_items`).
+
+    ```
+    >>> pager.bounds()
+    {'page': array('q', [1, 2, 3]), 'offset': array('q', [0, 3, 6]), 'limit': array('q', [3, 3, 3]), 'start': array('q', [0, 3, 6]), 'end': array('q', [3, 6, 8])}
+    ```
+
+    ## Parallel processing
+
+    `map(func, source, executor, workers)` splits a sequence or a queryset
+    into chunks of `page_size` items, calls `func` for every item in the
+    executor (a thread pool of `workers` threads by default) and yields
+    the results, in the source order or, with `ordered=False`, chunk by
+    chunk as they complete. Pass the number of workers of your executor:
+    only two chunks per worker are in flight at once. With
+    `chunk_size="auto"` the first items are processed in place to measure
+    the cost of one item, and the chunk size is chosen to make every chunk
+    take about `MAP_CHUNK_SECONDS`.
+
+    ```
+    >>> with ProcessPoolExecutor(4) as executor:
+    >>>     for thumbnail in pager.map(make_thumbnail, paths, executor, workers=4):
+    >>>         save(thumbnail)
+    ```
+
+    For process pools `func` must be picklable, and querysets are evaluated
+    in the calling process when chunks are pickled. Items are taken from
+    the first `total_items` of the source; without exact count the source
+    is measured with `len()` or `count()`.
     """
 
-    total_items: int = 0
+    total_items: int | None = 0
     page_size: int = 0
     page_num: int = 0
     limit: int = 0
     offset: int = 0
     start: int = 0
     end: int = 0
-
-    def __init__(self, total_items: int, page_size: int) -> None:
+    approximate: bool = False
+
+    def __init__(
+        self,
+        total_items: int | None = None,
+        page_size: int = 10,
+        approximate: bool = False,
+    ) -> None:
         self.total_items = total_items
         self.page_size = page_size
-        self.limit = page_size
+        self.approximate = approximate
+        self.counted = total_items is not None and not approximate
+        if total_items is not None:
+            # Оценка вроде pg_count() может быть -1 для таблицы без статистики
+            self.total_items = max(total_items, 0)
+        # Без точного количества выбираем на одну строку больше, чтобы
+        # узнать, есть ли следующая страница
+        self.limit = page_size if self.counted else page_size + 1
+        self.fetched_next: bool | None = None
         self.page_num = 1
         self.set_bounds()
 
     @property
-    def pages_count(self) -> int:
-        return math.ceil(self.total_items / self.page_size)
+    def pages_count(self) -> int | None:
+        if self.total_items is None:
+            return None
+        pages_count = math.ceil(self.total_items / self.page_size)
+        if self.counted:
+            return pages_count
+        return max(pages_count, self.page_num + bool(self.fetched_next))
+
+    def _bounds(self, page: int) -> tuple[int, int, int]:
+        """`offset`, `start` and `end` of the page."""
+        start = (page - 1) * self.page_size
+        if self.counted:
+            return (
+                min(start, self.total_items),
+                start,
+                min(start + self.page_size, self.total_items),
+            )
+        return start, start, start + self.limit
 
     def set_bounds(self) -> None:
-        offset = (self.page_num - 1) * self.page_size
-        self.offset = min(offset, self.total_items)
-        self.start = offset
-        self.end = min(offset + self.page_size, self.total_items)
+        self.offset, self.start, self.end = self._bounds(self.page_num)
+
+    def _clamp(self, page: int) -> int:
+        if not isinstance(page, int):
+            raise TypeError("Page must be an integer")
+        if self.counted:
+            # Пустой пейджер тоже остаётся на первой странице
+            page = min(page, self.pages_count)
+        return max(page, 1)
+
+    def at(self, page: int) -> PageView:
+        """Bounds of the page, without changing the pager."""
+        page = self._clamp(page)
+        offset, start, end = self._bounds(page)
+        return PageView(page, offset, self.limit, start, end)
+
+    def bounds(self, first: int = 1, last: int | None = None) -> dict[str, array]:
+        """Bounds of pages from `first` to `last` inclusive, column by column."""
+        if last is None:
+            if self.pages_count is None:
+                raise ValueError("The last page is required without total_items")
+            last = self.pages_count
+        if self.counted and not self.pages_count:
+            return {name: array("q") for name in PageView._fields}
+        first, last = self._clamp(first), self._clamp(last)
+        size = max(last - first + 1, 0)
+        step = self.page_size
+        start = (first - 1) * step
+        starts = array("q", range(start, start + size * step, step))
+        end = start + self.limit
+        ends = array("q", range(end, end + size * step, step))
+        if self.counted and size:
+            # Обрезается только последняя страница, смещения всегда в пределах
+            ends[-1] = min(ends[-1], self.total_items)
+        return {
+            "page": array("q", range(first, first + size)),
+            "offset": array("q", starts),
+            "limit": array("q", [self.limit]) * size,
+            "start": starts,
+            "end": ends,
+        }
 
     @property
     def page(self) -> int:
@@ -188,35 +443,253 @@ class Pager:
 
     @page.setter
     def page(self, page: int) -> None:
-        if not isinstance(page, int):
-            raise TypeError("Page must be an integer")
-        page = max(page, 1)
+        page = self._clamp(page)
         if page == self.page_num:
             return None
-        self.page_num = min(page, self.pages_count)
+        self.page_num = page
+        self.fetched_next = None
         self.set_bounds()
 
     @property
     def slicer(self) -> slice:
         return slice(self.start, self.end)
 
-    def state(self, *args: str) -> dict[str, int]:
-        return (
-            {arg: getattr(self, arg) for arg in args} if args else {
-                "page": self.page,
-                "pages_count": self.pages_count,
-                "total_items": self.total_items,
-                "page_size": self.page_size,
-                "offset": self.offset,
-                "limit": self.limit,
-                "start": self.start,
-                "end": self.end,
-            }
+    def state(self, *args: str) -> dict[str, int | bool | None]:
+        if args:
+            return {arg: getattr(self, arg) for arg in args}
+        state = {
+            "page": self.page,
+            "pages_count": self.pages_count,
+            "total_items": self.total_items,
+            "page_size": self.page_size,
+            "offset": self.offset,
+            "limit": self.limit,
+            "start": self.start,
+            "end": self.end,
+        }
+        if not self.counted:
+            state["approximate"] = self.approximate
+            state["has_next_page"] = self.has_next_page
+        return state
+
+    def paginate(self, rows: Iterable) -> list:
+        """
+        Takes up to `limit` rows fetched with `offset`/`limit` (or
+        `start`/`end`) bounds, returns page items and remembers
+        whether the next page exists. Needed when there is no exact count.
+        """
+        items = list(islice(rows, self.limit))
+        self.fetched_next = len(items) > self.page_size
+        del items[self.page_size :]
+        return items
+
+    def _pages(self) -> Iterator[PageView | Self]:
+        """
+        Pages which `__iter__` gives: views with exact count, otherwise
+        copies of the pager, which remember whether the next page exists.
+        """
+        if self.counted:
+            yield from map(self.at, range(1, self.pages_count + 1))
+            return
+        for number in count(1):
+            page = copy.copy(self)
+            page.page_num = number
+            page.fetched_next = None
+            page.set_bounds()
+            yield page
+
+    def _is_last(self, page: PageView | Self) -> bool:
+        return not self.counted and not page.fetched_next
+
+    def prefetch(
+        self,
+        fetch: Callable[[PageView | Self], Any],
+        ahead: int = 4,
+        executor: Executor | None = None,
+    ) -> Iterator[Any]:
+        """
+        Yields `fetch(page)` for every page in order, with up to `ahead`
+        pages fetched in background. Without `executor` a thread pool
+        of `ahead` workers is used.
+        """
+        if ahead < 1:
+            raise ValueError("At least one page must be fetched ahead")
+        own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(ahead, thread_name_prefix="pager")
+        pages = self._pages()
+        pending = deque(
+            (page, executor.submit(fetch, page)) for page in islice(pages, ahead)
+        )
+        try:
+            while pending:
+                page, future = pending.popleft()
+                result = future.result()
+                last = self._is_last(page)
+                if not last:
+                    pending.extend(
+                        (page, executor.submit(fetch, page))
+                        for page in islice(pages, 1)
+                    )
+                yield result
+                if last:
+                    return
+        finally:
+            for _, future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def aprefetch(
+        self,
+        fetch: Callable[[PageView | Self], Awaitable[Any]],
+        ahead: int = 4,
+    ) -> AsyncIterator[Any]:
+        """Async variant of `prefetch()`: fetches run as asyncio tasks."""
+        if ahead < 1:
+            raise ValueError("At least one page must be fetched ahead")
+        pages = self._pages()
+        pending = deque(
+            (page, asyncio.ensure_future(fetch(page)))
+            for page in islice(pages, ahead)
         )
+        try:
+            while pending:
+                page, task = pending.popleft()
+                result = await task
+                last = self._is_last(page)
+                if not last:
+                    pending.extend(
+                        (page, asyncio.ensure_future(fetch(page)))
+                        for page in islice(pages, 1)
+                    )
+                yield result
+                if last:
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def _source_size(self, source: Any) -> int:
+        if _is_queryset(source):
+            return self.total_items if self.counted else source.count()
+        if not isinstance(source, Sequence):
+            raise TypeError(f"{source.__class__!r} not a sequence or queryset")
+        if not self.counted:
+            return len(source)
+        if len(source) < self.total_items:
+            raise ValueError("Sequence is too short")
+        return self.total_items
+
+    def _probe(
+        self, func: Callable[[Any], Any], source: Any, total: int, workers: int
+    ) -> tuple[list, int]:
+        """
+        Processes the first items in place, in doubling chunks, for
+        `MAP_PROBE_SECONDS`. Returns the results and the chunk size.
+        """
+        results: list = []
+        size = 1
+        started = time.perf_counter()
+        while len(results) < total:
+            results.extend(map(func, source[len(results) : len(results) + size]))
+            if time.perf_counter() - started >= MAP_PROBE_SECONDS:
+                break
+            size *= 2
+        if not results:
+            return results, self.page_size
+        per_item = max(time.perf_counter() - started, 1e-9) / len(results)
+        # Не меньше нескольких чанков на воркер, чтобы нагрузка выравнивалась
+        balanced = math.ceil((total - len(results)) / (4 * workers))
+        return results, max(min(round(MAP_CHUNK_SECONDS / per_item), balanced), 1)
+
+    def map(
+        self,
+        func: Callable[[Any], Any],
+        source: Any,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        ordered: bool = True,
+        chunk_size: int | Literal["auto"] | None = None,
+    ) -> Iterator[Any]:
+        """
+        Yields `func(item)` for the source items, processed in chunks
+        in `executor`. Chunks have `page_size` items by default.
+        `workers` is the number of executor workers (`os.cpu_count()`
+        by default), it sets the number of chunks in flight.
+        """
+        if not (
+            chunk_size is None
+            or chunk_size == "auto"
+            or (isinstance(chunk_size, int) and chunk_size >= 1)
+        ):
+            raise ValueError(f"Invalid chunk size: {chunk_size!r}")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+        # Ошибки аргументов сразу, а не на первом next()
+        total = self._source_size(source)
+        return self._map(func, source, total, executor, workers, ordered, chunk_size)
+
+    def _map(
+        self,
+        func: Callable[[Any], Any],
+        source: Any,
+        total: int,
+        executor: Executor | None,
+        workers: int,
+        ordered: bool,
+        chunk_size: int | Literal["auto"] | None,
+    ) -> Iterator[Any]:
+        own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(workers, thread_name_prefix="pager")
+        pending: deque | set = deque()
+        try:
+            offset = 0
+            if chunk_size == "auto":
+                results, chunk_size = self._probe(func, source, total, workers)
+                yield from results
+                offset = len(results)
+            chunks = Pager(total - offset, chunk_size or self.page_size)
+            views = map(chunks.at, range(1, chunks.pages_count + 1))
+
+            def submit(number: int) -> list:
+                return [
+                    executor.submit(
+                        _map_chunk,
+                        func,
+                        source[offset + view.start : offset + view.end],
+                    )
+                    for view in islice(views, number)
+                ]
+
+            if ordered:
+                pending = deque(submit(2 * workers))
+                while pending:
+                    future = pending.popleft()
+                    results = future.result()
+                    pending.extend(submit(1))
+                    yield from results
+            else:
+                pending = set(submit(2 * workers))
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.update(submit(len(done)))
+                    for future in done:
+                        yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
 
     @property
     def has_next_page(self) -> bool:
-        return self.page < self.pages_count
+        if self.counted:
+            return self.page < self.pages_count
+        return bool(self.fetched_next)
 
     @property
     def has_prev_page(self) -> bool:
@@ -237,7 +710,10 @@ class Pager:
         return f"{repr_name}({repr_args_comma})"
 
     def __next__(self) -> Self:
-        if self.page >= self.pages_count:
+        if self.counted and self.page >= self.pages_count:
+            raise StopIteration
+        if not self.counted and self.page_num and not self.fetched_next:
+            # Следующая страница известна только после paginate() текущей
             raise StopIteration
         self.page += 1
         return self
@@ -247,6 +723,8 @@ class Pager:
         return self
 
     def __len__(self) -> int:
+        if self.pages_count is None:
+            raise TypeError("Pages count is unknown without total_items")
         return self.pages_count
 
     def __getitem__(self, item: int) -> Self:
@@ -254,8 +732,275 @@ class Pager:
         return self
 
     def __rmatmul__(self, sequence: Sequence) -> Sequence:
+        if not self.counted:
+            if not (_is_queryset(sequence) or isinstance(sequence, Sequence)):
+                raise TypeError(f"{sequence.__class__!r} not a sequence")
+            return self.paginate(sequence[self.start : self.end])
+        if _is_queryset(sequence):
+            # Querysets are sliced lazily, without len() and extra COUNT(*)
+            return sequence[self.start : self.end]
         if not isinstance(sequence, Sequence):
             raise TypeError(f"{sequence.__class__!r} not a sequence")
         if len(sequence) < self.total_items:
             raise ValueError("Sequence is too short")
         return sequence[self.start : self.end]
+
+
+class KeysetPager:
+    """
+    # A KeysetPager class is a helper for keyset (cursor) pagination.
+
+    Offset pagination makes the database scan and discard `offset` rows,
+    so deep pages of big tables get slower and slower. Keyset pagination
+    filters by the last seen value of the ordering key instead
+    (`WHERE key > %s ORDER BY key LIMIT n`), which costs the same for any
+    page if the key is indexed. The price is that pages can only be walked
+    forth and back from the current one: there are no page numbers and no
+    `total_items`.
+
+    The position is passed between requests as an opaque cursor: a URL-safe
+    base64 string with the encoded key values of the last seen item.
+
+    ## Declare KeysetPager
+
+    - `*key: str` - ordering key, one or several fields which are unique
+      together; prefix `-` means descending order, like in Django
+    - `page_size: int` - number of items per page, default is 10
+    - `cursor: str | None` - cursor from the previous page, `None` for the first
+
+    ```
+    >>> pager = KeysetPager("id", page_size=3)
+    ```
+
+    ## Applying to querysets and sequences
+
+    Django querysets are filtered, ordered and limited to `page_size + 1`
+    items, the extra item tells whether there is a next page. Querysets of
+    other ORMs raise `TypeError`, use raw SQL helpers below for them.
+    Sequences must be sorted by the key, the page is found by binary search.
+
+    ```
+    >>> items = [{"id": i} for i in range(8)]
+    >>> items @ pager
+    [{'id': 0}, {'id': 1}, {'id': 2}]
+    >>> pager.has_next_page, pager.has_prev_page
+    (True, False)
+    >>> items @ KeysetPager("id", page_size=3, cursor=pager.next_cursor)
+    [{'id': 3}, {'id': 4}, {'id': 5}]
+    >>> django_queryset.filter(active=True) @ KeysetPager("-created", "id")
+    ```
+
+    ## Raw SQL
+
+    `where` gives the SQL condition with params (`None` for the first page),
+    `order` gives the ORDER BY clause and `limit` the number of rows to fetch.
+    Pass the fetched rows to `paginate()` to get the page and the cursors.
+
+    ```
+    >>> pager = KeysetPager("id", page_size=3, cursor=cursor)
+    >>> where, params = pager.where or ("TRUE", [])
+    >>> cursor.execute(
+    >>>     f"SELECT * FROM t WHERE {where} ORDER BY {pager.order} LIMIT {pager.limit}",
+    >>>     params,
+    >>> )
+    >>> rows = pager.paginate(cursor.fetchall())
+    ```
+
+    Items are read by key names: mappings by subscription, other objects by
+    attributes. Key values in cursors may be JSON types (`str`, `int`,
+    `float`, `bool`, `None`) or one of `CURSOR_TYPES`: `datetime`, `date`,
+    `time`, `Decimal` and `UUID`; other types raise `TypeError`.
+
+    ## Dict serialization
+
+    ```
+    >>> pager.state()
+    {'page_size': 3, 'has_prev_page': False, 'has_next_page': True, 'prev_cursor': None, 'next_cursor': 'WzAsWzJdXQ'}
+    ```
+    """
+
+    def __init__(
+        self,
+        *key: str,
+        page_size: int = 10,
+        cursor: str | None = None,
+    ) -> None:
+        if not key:
+            raise ValueError("Keyset pagination requires an ordering key")
+        self.keys = tuple(name.lstrip("-") for name in key)
+        self.descending = tuple(name.startswith("-") for name in key)
+        self.page_size = page_size
+        self.limit = page_size + 1
+        self.cursor = cursor
+        self.backwards, self.after = (
+            self.decode_cursor(cursor) if cursor else (False, None)
+        )
+        self.has_prev_page = False
+        self.has_next_page = False
+        self.prev_cursor: str | None = None
+        self.next_cursor: str | None = None
+
+    def _encode_value(self, value: Any) -> Any:
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        for tag, (value_type, _) in CURSOR_TYPES.items():
+            if isinstance(value, value_type):
+                return {tag: str(value)}
+        raise TypeError(f"Unsupported key value type: {value.__class__!r}")
+
+    def _decode_value(self, value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        ((tag, text),) = value.items()
+        return CURSOR_TYPES[tag][1](text)
+
+    def encode_cursor(self, values: tuple, backwards: bool = False) -> str:
+        data = json.dumps(
+            [int(backwards), [self._encode_value(value) for value in values]],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[bool, tuple]:
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            backwards, values = json.loads(data)
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError
+            return bool(backwards), tuple(map(self._decode_value, values))
+        except (ValueError, TypeError, KeyError, ArithmeticError):
+            raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+    def key_of(self, item: Any) -> tuple:
+        if isinstance(item, Mapping):
+            return tuple(item[name] for name in self.keys)
+        return tuple(getattr(item, name) for name in self.keys)
+
+    def _ascending(self, descending: bool) -> bool:
+        # Backwards pages are fetched in reversed order
+        return descending == self.backwards
+
+    @property
+    def order_by(self) -> list[str]:
+        """Ordering in Django `order_by()` format."""
+        return [
+            name if self._ascending(descending) else f"-{name}"
+            for name, descending in zip(self.keys, self.descending)
+        ]
+
+    @property
+    def order(self) -> str:
+        """ORDER BY clause for raw SQL."""
+        return ", ".join(
+            f"{name} {'ASC' if self._ascending(descending) else 'DESC'}"
+            for name, descending in zip(self.keys, self.descending)
+        )
+
+    @property
+    def where(self) -> tuple[str, list] | None:
+        """WHERE condition with params for raw SQL, `None` for the first page."""
+        if self.after is None:
+            return None
+        signs = [">" if self._ascending(d) else "<" for d in self.descending]
+        if len(set(signs)) == 1:
+            # Row value comparison can use a composite index
+            columns = ", ".join(self.keys)
+            placeholders = ", ".join(["%s"] * len(self.keys))
+            if len(self.keys) == 1:
+                return f"{columns} {signs[0]} %s", list(self.after)
+            return f"({columns}) {signs[0]} ({placeholders})", list(self.after)
+        clauses, params = [], []
+        for i, (name, sign) in enumerate(zip(self.keys, signs)):
+            equal = [f"{prev} = %s" for prev in self.keys[:i]]
+            clauses.append("(" + " AND ".join([*equal, f"{name} {sign} %s"]) + ")")
+            params.extend(self.after[: i + 1])
+        return " OR ".join(clauses), params
+
+    def _compare(self, left: tuple, right: tuple) -> int:
+        """Compares key values in the declared key order: -1, 0 or 1."""
+        for a, b, descending in zip(left, right, self.descending):
+            if a != b:
+                return 1 if (a > b) != descending else -1
+        return 0
+
+    def paginate(self, rows: Iterable) -> list:
+        """
+        Takes up to `limit` rows fetched with `where`/`order` bounds,
+        returns the page items in the key order and updates `has_*_page`
+        and cursors.
+        """
+        items = list(islice(rows, self.limit))
+        has_more = len(items) > self.page_size
+        del items[self.page_size :]
+        if self.backwards:
+            items.reverse()
+            self.has_prev_page, self.has_next_page = has_more, True
+        else:
+            self.has_prev_page, self.has_next_page = self.after is not None, has_more
+        self.prev_cursor = self.next_cursor = None
+        if items and self.has_prev_page:
+            self.prev_cursor = self.encode_cursor(self.key_of(items[0]), True)
+        if items and self.has_next_page:
+            self.next_cursor = self.encode_cursor(self.key_of(items[-1]))
+        return items
+
+    def _filter_queryset(self, queryset: Any) -> Any:
+        if QuerySet is None or not isinstance(queryset, QuerySet):
+            raise TypeError(
+                f"{queryset.__class__!r} not a Django queryset, "
+                "use `where` and `order` for other ORMs"
+            )
+        queryset = queryset.order_by(*self.order_by)
+        if self.after is None:
+            return queryset
+        condition = Q()
+        for i, (name, descending) in enumerate(zip(self.keys, self.descending)):
+            lookup = "gt" if self._ascending(descending) else "lt"
+            condition |= Q(
+                **dict(zip(self.keys[:i], self.after[:i])),
+                **{f"{name}__{lookup}": self.after[i]},
+            )
+        return queryset.filter(condition)
+
+    def _bisect(self, sequence: Sequence, strict: bool) -> int:
+        """First index with the key after (or at, if not `strict`) the cursor."""
+        low, high = 0, len(sequence)
+        while low < high:
+            middle = (low + high) // 2
+            compared = self._compare(self.key_of(sequence[middle]), self.after)
+            if compared > 0 or (compared == 0 and not strict):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _slice_sequence(self, sequence: Sequence) -> Sequence:
+        if self.after is None:
+            return sequence[: self.limit]
+        if self.backwards:
+            end = self._bisect(sequence, strict=False)
+            return sequence[max(end - self.limit, 0) : end][::-1]
+        start = self._bisect(sequence, strict=True)
+        return sequence[start : start + self.limit]
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "page_size": self.page_size,
+            "has_prev_page": self.has_prev_page,
+            "has_next_page": self.has_next_page,
+            "prev_cursor": self.prev_cursor,
+            "next_cursor": self.next_cursor,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(keys={self.keys!r}, "
+            f"page_size={self.page_size}, cursor={self.cursor!r})"
+        )
+
+    def __rmatmul__(self, source: Any) -> list:
+        if _is_queryset(source):
+            return self.paginate(self._filter_queryset(source)[: self.limit])
+        if not isinstance(source, Sequence):
+            raise TypeError(f"{source.__class__!r} not a sequence or queryset")
+        return self.paginate(self._slice_sequence(source))
@@ -0,0 +1,85 @@
+"""
+Benchmarks for pager.py with simulated latency.
+
+Run from the `usefuls` directory of the repository:
+
+    python pager_benchmarks.py
+"""
+
+import asyncio
+import math
+import time
+from collections.abc import Callable
+
+from pager import PageView, Pager
+
+
+def bench_prefetch(
+    total_items: int = 2_000,
+    page_size: int = 50,
+    latency: float = 0.01,
+    ahead: tuple[int, ...] = (1, 2, 4, 8),
+) -> None:
+    """Pages of a list with simulated database latency of every fetch."""
+    items = list(range(total_items))
+
+    def fetch(page: PageView) -> list:
+        time.sleep(latency)
+        return items @ page
+
+    async def afetch(page: PageView) -> list:
+        await asyncio.sleep(latency)
+        return items @ page
+
+    async def acollect(pager: Pager, n: int) -> list:
+        return [rows async for rows in pager.aprefetch(afetch, n)]
+
+    def timed(run: Callable[[], list]) -> float:
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
+
+    print(f"{total_items:,} items by {page_size}, {latency * 1000:g} ms per fetch")
+    pager = Pager(total_items, page_size)
+    baseline = timed(lambda: [fetch(page) for page in pager])
+    print(f"  {'sequential':<24}{baseline:>8.3f} s{1:>8.2f}x")
+    for n in ahead:
+        for name, run in (
+            (f"prefetch, ahead={n}", lambda: list(pager.prefetch(fetch, n))),
+            (f"aprefetch, ahead={n}", lambda: asyncio.run(acollect(pager, n))),
+        ):
+            seconds = timed(run)
+            print(f"  {name:<24}{seconds:>8.3f} s{baseline / seconds:>8.2f}x")
+
+
+def bench_map(
+    total_items: int = 20_000, latency: float = 0.0002, workers: int = 8
+) -> None:
+    """Pager.map() with a thread pool: dispatch overhead and waiting items."""
+    items = list(range(total_items))
+
+    def wait_item(item: int) -> float:
+        time.sleep(latency)
+        return item
+
+    for title, func, size in (
+        ("cheap items (math.sqrt)", math.sqrt, total_items),
+        (f"{latency * 1000:g} ms of waiting per item", wait_item, total_items // 10),
+    ):
+        print(f"{size:,} {title}, {workers} threads")
+        started = time.perf_counter()
+        [func(item) for item in items[:size]]
+        baseline = time.perf_counter() - started
+        print(f"  {'sequential':<24}{baseline:>8.3f} s{1:>8.2f}x")
+        for chunk_size in (1, 100, "auto"):
+            pager = Pager(size, page_size=100)
+            started = time.perf_counter()
+            list(pager.map(func, items, workers=workers, chunk_size=chunk_size))
+            seconds = time.perf_counter() - started
+            name = f"map, chunk_size={chunk_size}"
+            print(f"  {name:<24}{seconds:>8.3f} s{baseline / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    bench_prefetch()
+    bench_map()
@@ -0,0 +1,448 @@
+import asyncio
+import base64
+import datetime
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import TestCase, skipIf
+from uuid import UUID
+
+from pager import KeysetPager, PageView, Pager, QuerySet
+
+
+class FakeQuerySet:
+    """Some other ORM: has `filter` and `order_by`, but is not Django."""
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+
+class TestPager(TestCase):
+    def test_counted(self):
+        pager = Pager(total_items=8, page_size=3)
+        self.assertEqual(len(pager), 3)
+        self.assertEqual(range(20) @ pager[3], range(6, 8))
+        self.assertEqual(pager[99].page, 3)
+        self.assertEqual(pager[-1].page, 1)
+        self.assertEqual([list(range(10)) @ page for page in pager], [
+            [0, 1, 2], [3, 4, 5], [6, 7],
+        ])
+        self.assertNotIn("has_next_page", pager.state())
+        with self.assertRaises(ValueError):
+            list(range(5)) @ pager
+
+    def test_count_free_paginate(self):
+        pager = Pager(page_size=3)
+        self.assertIsNone(pager.pages_count)
+        self.assertEqual((pager.offset, pager.limit, pager.end), (0, 4, 4))
+        with self.assertRaises(TypeError):
+            len(pager)
+        self.assertEqual(pager.paginate(iter(range(10))), [0, 1, 2])
+        self.assertTrue(pager.has_next_page)
+        pager.page = 3
+        self.assertIsNone(pager.fetched_next)
+        self.assertEqual((pager.offset, pager.end), (6, 10))
+        self.assertEqual(pager.paginate([6, 7, 8]), [6, 7, 8])
+        self.assertFalse(pager.has_next_page)
+        self.assertEqual(pager.state("has_next_page", "approximate"), {
+            "has_next_page": False, "approximate": False,
+        })
+
+    def test_count_free_iteration(self):
+        for size in (0, 1, 3, 8, 9):
+            with self.subTest(size=size):
+                items = list(range(size))
+                pages = [items @ page for page in Pager(page_size=3)]
+                self.assertEqual(sum(pages, []), items)
+                self.assertEqual(len(pages), max(-(-size // 3), 1))
+
+    def test_count_free_without_paginate_stops(self):
+        self.assertEqual([page.page for page in Pager(page_size=3)], [1])
+
+    def test_approximate(self):
+        pager = Pager(10, page_size=3, approximate=True)
+        self.assertEqual(pager.pages_count, 4)
+        self.assertEqual(pager.limit, 4)
+        pager.page = 10
+        self.assertEqual(pager.page, 10)
+        self.assertEqual(list(range(100)) @ pager, [27, 28, 29])
+        self.assertEqual(pager.pages_count, 11)
+        self.assertEqual(Pager(-1, approximate=True).total_items, 0)
+
+
+class TestPageViews(TestCase):
+    def test_at_matches_iteration(self):
+        for total, page_size in ((0, 3), (1, 3), (8, 3), (9, 3), (10, 1)):
+            with self.subTest(total=total, page_size=page_size):
+                pager = Pager(total, page_size)
+                expected = [
+                    (page.page, page.offset, page.limit, page.start, page.end)
+                    for page in Pager(total, page_size)
+                ]
+                views = [pager.at(n) for n in range(1, len(pager) + 1)]
+                self.assertEqual([tuple(view) for view in views], expected)
+                self.assertEqual(list(zip(*pager.bounds().values())), expected)
+                self.assertEqual(pager.page, 1)
+
+    def test_at_clamps(self):
+        pager = Pager(8, 3)
+        self.assertEqual(pager.at(0), PageView(1, 0, 3, 0, 3))
+        self.assertEqual(pager.at(99), PageView(3, 6, 3, 6, 8))
+        self.assertEqual(range(10) @ pager.at(2), range(3, 6))
+        self.assertEqual(pager.at(2).slicer, slice(3, 6))
+        with self.assertRaises(AttributeError):
+            pager.at(1).page = 2
+        with self.assertRaises(TypeError):
+            pager.at(1.5)
+
+    def test_empty_pager(self):
+        pager = Pager(0, 3)
+        self.assertEqual(pager.at(1), PageView(1, 0, 3, 0, 0))
+        self.assertEqual(pager.at(5), PageView(1, 0, 3, 0, 0))
+        pager.page = 5
+        self.assertEqual((pager.page, pager.slicer), (1, slice(0, 0)))
+
+    def test_bounds_clamps(self):
+        pager = Pager(8, 3)
+        self.assertEqual(pager.bounds(2, 99)["end"], array("q", [6, 8]))
+        self.assertEqual(pager.bounds(-5, 1)["page"], array("q", [1]))
+        self.assertEqual(pager.bounds(3, 1)["page"], array("q"))
+        self.assertEqual(Pager(0, 3).bounds()["page"], array("q"))
+
+    def test_count_free_bounds(self):
+        pager = Pager(page_size=3)
+        with self.assertRaises(ValueError):
+            pager.bounds()
+        bounds = pager.bounds(2, 3)
+        self.assertEqual(bounds["limit"], array("q", [4, 4]))
+        self.assertEqual(bounds["end"], array("q", [7, 10]))
+        self.assertEqual(pager.at(5), PageView(5, 12, 4, 12, 16))
+
+
+class TestPrefetch(TestCase):
+    def test_ordered(self):
+        items = list(range(23))
+
+        def fetch(page):
+            # Later pages complete first
+            time.sleep(0.001 * (6 - page.page))
+            return items @ page
+
+        pages = list(Pager(23, 5).prefetch(fetch, ahead=3))
+        self.assertEqual(pages, [items[i : i + 5] for i in range(0, 23, 5)])
+        self.assertEqual(list(Pager(0, 5).prefetch(fetch)), [])
+        with self.assertRaises(ValueError):
+            list(Pager(23, 5).prefetch(fetch, ahead=0))
+
+    def test_count_free(self):
+        items = list(range(23))
+        for pager in (Pager(page_size=5), Pager(100, 5, approximate=True)):
+            with self.subTest(pager=pager):
+                pages = list(pager.prefetch(lambda page: items @ page, ahead=3))
+                self.assertEqual(sum(pages, []), items)
+                self.assertEqual(len(pages), 5)
+
+    def test_cancellation(self):
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch(page):
+            time.sleep(0.005)
+            with lock:
+                fetched.append(page.page)
+            return page.page
+
+        with ThreadPoolExecutor(2) as executor:
+            pages = Pager(1000, 1).prefetch(fetch, ahead=2, executor=executor)
+            self.assertEqual(next(pages), 1)
+            pages.close()
+        self.assertLess(len(fetched), 10)
+
+    def test_errors(self):
+        def fetch(page):
+            if page.page == 2:
+                raise KeyError(page.page)
+            return page.page
+
+        pages = Pager(10, 1).prefetch(fetch)
+        self.assertEqual(next(pages), 1)
+        with self.assertRaises(KeyError):
+            next(pages)
+
+    def test_async(self):
+        items = list(range(23))
+
+        async def fetch(page):
+            await asyncio.sleep(0.001 * (6 - page.page))
+            return items @ page
+
+        async def collect(pager):
+            return [rows async for rows in pager.aprefetch(fetch, ahead=3)]
+
+        for pager in (Pager(23, 5), Pager(page_size=5)):
+            with self.subTest(pager=pager):
+                pages = asyncio.run(collect(pager))
+                self.assertEqual(pages, [items[i : i + 5] for i in range(0, 23, 5)])
+
+
+class TestKeysetPager(TestCase):
+    def walk(self, rows, *key, page_size=3):
+        """All pages forth from the start, then back from the last one."""
+        forth, cursor = [], None
+        while True:
+            pager = KeysetPager(*key, page_size=page_size, cursor=cursor)
+            forth.append(rows @ pager)
+            if not pager.has_next_page:
+                break
+            cursor = pager.next_cursor
+        back, cursor = [], pager.prev_cursor
+        while cursor:
+            pager = KeysetPager(*key, page_size=page_size, cursor=cursor)
+            back.insert(0, rows @ pager)
+            self.assertTrue(pager.has_next_page)
+            cursor = pager.prev_cursor
+        return forth, back
+
+    def test_forward_and_backward(self):
+        rows = [{"a": i % 3, "b": i} for i in range(10)]
+        for key in (("b",), ("-b",), ("a", "b"), ("-a", "b"), ("a", "-b")):
+            with self.subTest(key=key):
+                ordered = sorted(rows, key=lambda row: row["b"])
+                for name in reversed(key):
+                    ordered.sort(
+                        key=lambda row: row[name.lstrip("-")],
+                        reverse=name.startswith("-"),
+                    )
+                forth, back = self.walk(ordered, *key)
+                self.assertEqual(sum(forth, []), ordered)
+                self.assertEqual(back, forth[:-1])
+                self.assertTrue(all(len(page) == 3 for page in back))
+
+    def test_objects_and_empty(self):
+        rows = [type("Row", (), {"id": i})() for i in range(4)]
+        forth, back = self.walk(rows, "id")
+        self.assertEqual(sum(forth, []), rows)
+        self.assertEqual(self.walk([], "id"), ([[]], []))
+        with self.assertRaises(ValueError):
+            KeysetPager()
+
+    def test_raw_sql(self):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+        connection.executemany(
+            "INSERT INTO t VALUES (?, ?)", [(i % 3, i) for i in range(10)]
+        )
+        for key in (("b",), ("a", "b"), ("-a", "b")):
+            with self.subTest(key=key):
+                expected = KeysetPager(*key).order
+                expected = connection.execute(
+                    f"SELECT a, b FROM t ORDER BY {expected}"
+                ).fetchall()
+                rows, cursor = [], None
+                while True:
+                    pager = KeysetPager(*key, page_size=4, cursor=cursor)
+                    where, params = pager.where or ("1 = 1", [])
+                    fetched = connection.execute(
+                        f"SELECT a, b FROM t WHERE {where.replace('%s', '?')} "
+                        f"ORDER BY {pager.order} LIMIT {pager.limit}",
+                        params,
+                    )
+                    rows += pager.paginate(dict(zip("ab", row)) for row in fetched)
+                    if not pager.has_next_page:
+                        break
+                    cursor = pager.next_cursor
+                self.assertEqual([(row["a"], row["b"]) for row in rows], expected)
+
+    def test_typed_key_values(self):
+        pager = KeysetPager("created", "amount", "uid", "day", "at", "id")
+        values = (
+            datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.UTC),
+            Decimal("10.50"),
+            UUID("12345678-1234-5678-1234-567812345678"),
+            datetime.date(2024, 5, 1),
+            datetime.time(8, 15),
+            7,
+        )
+        backwards, decoded = pager.decode_cursor(pager.encode_cursor(values, True))
+        self.assertTrue(backwards)
+        self.assertEqual(decoded, values)
+        self.assertEqual(
+            [type(value) for value in decoded], [type(value) for value in values]
+        )
+
+    def test_datetime_key_pages(self):
+        start = datetime.datetime(2024, 1, 1)
+        rows = [
+            {"created": start + datetime.timedelta(hours=i // 2), "id": i}
+            for i in range(10)
+        ]
+        pages, cursor = [], None
+        while True:
+            pager = KeysetPager("created", "id", page_size=3, cursor=cursor)
+            pages.append([row["id"] for row in rows @ pager])
+            if not pager.has_next_page:
+                break
+            cursor = pager.next_cursor
+        self.assertEqual(pages, [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]])
+
+    def test_unsupported_key_value(self):
+        pager = KeysetPager("id")
+        with self.assertRaises(TypeError):
+            pager.encode_cursor((object(),))
+
+    def test_other_orm(self):
+        with self.assertRaises(TypeError):
+            FakeQuerySet() @ KeysetPager("id")
+
+    def test_invalid_cursor(self):
+        pager = KeysetPager("id")
+        for data in (b"!!", b"[0,[1,2]]", b'[0,[{"decimal":"x"}]]', b'[0,[{"x":"1"}]]'):
+            cursor = base64.urlsafe_b64encode(data).decode()
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                pager.decode_cursor(cursor)
+
+
+@skipIf(QuerySet is None, "Django is not installed")
+class TestKeysetQuerysets(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import django
+        from django.conf import settings
+        from django.db import connection, models
+
+        if not settings.configured:
+            settings.configure(
+                DATABASES={
+                    "default": {
+                        "ENGINE": "django.db.backends.sqlite3",
+                        "NAME": ":memory:",
+                    }
+                },
+            )
+            django.setup()
+        cls.model = type(
+            "KeysetRow",
+            (models.Model,),
+            {
+                "__module__": __name__,
+                "group": models.IntegerField(),
+                "created": models.DateTimeField(),
+                "Meta": type("Meta", (), {"app_label": "test_pager"}),
+            },
+        )
+        with connection.schema_editor() as editor:
+            editor.create_model(cls.model)
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+        cls.model.objects.bulk_create(
+            cls.model(group=i % 3, created=start + datetime.timedelta(days=i % 4))
+            for i in range(20)
+        )
+
+    def walk(self, *key):
+        queryset = self.model.objects.all()
+        ids, cursor = [], None
+        while True:
+            pager = KeysetPager(*key, page_size=3, cursor=cursor)
+            ids += [row.id for row in queryset @ pager]
+            if not pager.has_next_page:
+                return ids, pager
+            cursor = pager.next_cursor
+
+    def test_forward_and_backward(self):
+        for key in (("id",), ("-group", "id"), ("created", "-id")):
+            with self.subTest(key=key):
+                expected = list(
+                    self.model.objects.order_by(*key).values_list("id", flat=True)
+                )
+                ids, last = self.walk(*key)
+                self.assertEqual(ids, expected)
+                back, cursor = [], last.prev_cursor
+                while cursor:
+                    pager = KeysetPager(*key, page_size=3, cursor=cursor)
+                    back = [row.id for row in self.model.objects.all() @ pager] + back
+                    cursor = pager.prev_cursor
+                self.assertEqual(back, expected[: len(back)])
+                self.assertGreaterEqual(len(back), len(expected) - 3)
+
+
+class TestPagerMap(TestCase):
+    def test_invalid_arguments(self):
+        pager = Pager(page_size=3)
+        for chunk_size in (-1, 0, 1.5, "fast"):
+            with self.subTest(chunk_size=chunk_size), self.assertRaises(ValueError):
+                pager.map(abs, [1, 2], chunk_size=chunk_size)
+        with self.assertRaises(ValueError):
+            pager.map(abs, [1, 2], workers=0)
+        with self.assertRaises(TypeError):
+            pager.map(abs, iter([1, 2]))
+
+    def test_ordered(self):
+        items = list(range(100))
+        for chunk_size in (None, 1, 7, 1000, "auto"):
+            with self.subTest(chunk_size=chunk_size):
+                results = Pager(page_size=10).map(
+                    lambda item: item * item, items, workers=3, chunk_size=chunk_size
+                )
+                self.assertEqual(list(results), [item * item for item in items])
+
+    def test_unordered(self):
+        items = list(range(100))
+
+        def slow(item):
+            # Early chunks complete last
+            time.sleep(0.0001 * (100 - item))
+            return item
+
+        results = list(Pager(page_size=10).map(slow, items, workers=4, ordered=False))
+        self.assertEqual(sorted(results), items)
+
+    def test_total_items(self):
+        items = list(range(100))
+        self.assertEqual(list(Pager(25, 10).map(abs, items)), items[:25])
+        self.assertEqual(list(Pager(0, 10).map(abs, items)), [])
+        self.assertEqual(list(Pager(page_size=10).map(abs, [], chunk_size="auto")), [])
+        with self.assertRaises(ValueError):
+            Pager(200, 10).map(abs, items)
+
+    def test_auto_chunk_size(self):
+        chunks = []
+
+        def record(item):
+            chunks.append(threading.current_thread().name)
+            time.sleep(0.0005)
+            return item
+
+        items = list(range(200))
+        self.assertEqual(list(Pager().map(record, items, chunk_size="auto")), items)
+        # The first items are measured in the calling thread
+        self.assertEqual(chunks[0], threading.current_thread().name)
+        self.assertIn("pager", chunks[-1])
+
+    def test_cancellation(self):
+        calls = []
+
+        def func(item):
+            calls.append(item)
+            return item
+
+        with ThreadPoolExecutor(1) as executor:
+            results = Pager(page_size=10).map(func, range(10_000), executor, workers=1)
+            self.assertEqual(next(results), 0)
+            results.close()
+        self.assertLess(len(calls), 100)
+
+    def test_errors(self):
+        def func(item):
+            if item == 55:
+                raise KeyError(item)
+            return item
+
+        with self.assertRaises(KeyError):
+            list(Pager(page_size=10).map(func, range(100)))